@@ -1,10 +1,13 @@
 import os
+from functools import lru_cache
 from google.cloud import bigquery
 from api.settings import settings
 
 
+@lru_cache(maxsize=1)
 def get_bq_client():
+    # built once per process so credentials are read and the env var is set only once
     os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = (
         settings.google_application_credentials
     )
-    return bigquery.Client()
+    return bigquery.Client(project=settings.bq_project_name)
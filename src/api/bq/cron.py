@@ -1,9 +1,17 @@
+import asyncio
+import backoff
+import gzip
+import tempfile
+import aiosqlite
+import orjson
 from google.cloud import bigquery
-from google.api_core.exceptions import NotFound
-from typing import List, Dict, Any
+from google.api_core.exceptions import NotFound, ServerError, TooManyRequests
+from contextlib import asynccontextmanager
+from typing import Any, BinaryIO, Callable, Dict, List, Tuple
 from api.settings import settings
 from api.utils.db import get_new_db_connection
 from api.config import (
+    sqlite_db_path,
     org_api_keys_table_name,
     courses_table_name,
     milestones_table_name,
@@ -25,14 +33,58 @@ from api.config import (
 from api.utils.logging import logger
 from api.bq.base import get_bq_client
 
+# Maximum number of tables synced to BigQuery at the same time. Each sync holds
+# its whole table in memory while it is converted and uploaded, so peak memory
+# grows with this limit when the large tables (chat_history, task_completions,
+# questions) happen to run together
+MAX_CONCURRENT_TABLE_SYNCS = 3
+
+# Number of rows serialised together when staging data for a BigQuery load job
+CHUNK_SIZE = 500
+
+# Number of rows read from SQLite per fetchmany call when reading a table
+FETCH_SIZE = 10_000
+
+# Schemas for the BigQuery tables the sync creates when they do not exist yet
+_COHORTS_SCHEMA = (
+    bigquery.SchemaField("id", "INTEGER", mode="REQUIRED"),
+    bigquery.SchemaField("name", "STRING", mode="REQUIRED"),
+    bigquery.SchemaField("org_id", "INTEGER", mode="REQUIRED"),
+    bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED"),
+    bigquery.SchemaField("updated_at", "TIMESTAMP", mode="NULLABLE"),
+    bigquery.SchemaField("deleted_at", "TIMESTAMP", mode="NULLABLE"),
+)
+_USER_COHORTS_SCHEMA = (
+    bigquery.SchemaField("id", "INTEGER", mode="REQUIRED"),
+    bigquery.SchemaField("user_id", "INTEGER", mode="REQUIRED"),
+    bigquery.SchemaField("cohort_id", "INTEGER", mode="REQUIRED"),
+    bigquery.SchemaField("role", "STRING", mode="REQUIRED"),
+    bigquery.SchemaField("joined_at", "TIMESTAMP", mode="REQUIRED"),
+    bigquery.SchemaField("updated_at", "TIMESTAMP", mode="NULLABLE"),
+    bigquery.SchemaField("deleted_at", "TIMESTAMP", mode="NULLABLE"),
+)
+_ASSIGNMENTS_SCHEMA = (
+    bigquery.SchemaField("id", "INTEGER", mode="REQUIRED"),
+    bigquery.SchemaField("task_id", "INTEGER", mode="REQUIRED"),
+    bigquery.SchemaField("blocks", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("input_type", "STRING", mode="REQUIRED"),
+    bigquery.SchemaField("response_type", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("context", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("evaluation_criteria", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("max_attempts", "INTEGER", mode="NULLABLE"),
+    bigquery.SchemaField("settings", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED"),
+    bigquery.SchemaField("updated_at", "TIMESTAMP", mode="NULLABLE"),
+    bigquery.SchemaField("deleted_at", "TIMESTAMP", mode="NULLABLE"),
+)
+
 
 async def sync_org_api_keys_to_bigquery():
     """
     Sync org_api_keys table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite org_api_keys table
-    2. Deletes all existing data from BigQuery org_api_keys table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery org_api_keys table with the SQLite data
     """
     try:
         logger.info("Starting sync of org_api_keys table to BigQuery")
@@ -48,18 +100,19 @@ async def sync_org_api_keys_to_bigquery():
         bq_client = get_bq_client()
         table_id = f"{settings.bq_project_name}.{settings.bq_dataset_name}.{org_api_keys_table_name}"
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info("Deleted all existing records from BigQuery org_api_keys table")
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery org_api_keys table"
             )
         else:
-            logger.info("No data to insert into BigQuery org_api_keys table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery org_api_keys table"
+            )
 
         logger.info("Successfully completed sync of org_api_keys table to BigQuery")
         print("Org API Keys sync completed successfully!")
@@ -75,8 +128,7 @@ async def sync_courses_to_bigquery():
     Sync courses table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite courses table
-    2. Deletes all existing data from BigQuery courses table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery courses table with the SQLite data
     """
     try:
         logger.info("Starting sync of courses table to BigQuery")
@@ -90,18 +142,19 @@ async def sync_courses_to_bigquery():
         bq_client = get_bq_client()
         table_id = f"{settings.bq_project_name}.{settings.bq_dataset_name}.{courses_table_name}"
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info("Deleted all existing records from BigQuery courses table")
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery courses table"
             )
         else:
-            logger.info("No data to insert into BigQuery courses table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery courses table"
+            )
 
         logger.info("Successfully completed sync of courses table to BigQuery")
         print("Courses sync completed successfully!")
@@ -117,8 +170,7 @@ async def sync_cohorts_to_bigquery():
     Sync cohorts table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite cohorts table
-    2. Deletes all existing data from BigQuery cohorts table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery cohorts table with the SQLite data
     """
     try:
         logger.info("Starting sync of cohorts table to BigQuery")
@@ -136,34 +188,29 @@ async def sync_cohorts_to_bigquery():
 
         # Ensure BigQuery table exists with the expected schema
         try:
-            bq_client.get_table(table_id)
+            await asyncio.to_thread(bq_client.get_table, table_id)
         except NotFound:
             logger.info(
                 f"BigQuery table {table_id} not found, creating it with cohorts schema."
             )
-            schema = [
-                bigquery.SchemaField("id", "INTEGER", mode="REQUIRED"),
-                bigquery.SchemaField("name", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("org_id", "INTEGER", mode="REQUIRED"),
-                bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED"),
-                bigquery.SchemaField("updated_at", "TIMESTAMP", mode="NULLABLE"),
-                bigquery.SchemaField("deleted_at", "TIMESTAMP", mode="NULLABLE"),
-            ]
-            table = bigquery.Table(table_id, schema=schema)
-            bq_client.create_table(table)
-
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info("Deleted all existing records from BigQuery cohorts table")
-
-        # Step 4: Insert SQLite data into BigQuery
+            table = bigquery.Table(table_id, schema=_COHORTS_SCHEMA)
+            # cluster on id so point lookups by id only scan the matching blocks
+            table.clustering_fields = ["id"]
+            await asyncio.to_thread(bq_client.create_table, table)
+
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery cohorts table"
             )
         else:
-            logger.info("No data to insert into BigQuery cohorts table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery cohorts table"
+            )
 
         logger.info("Successfully completed sync of cohorts table to BigQuery")
         print("Cohorts sync completed successfully!")
@@ -179,8 +226,7 @@ async def sync_milestones_to_bigquery():
     Sync milestones table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite milestones table
-    2. Deletes all existing data from BigQuery milestones table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery milestones table with the SQLite data
     """
     try:
         logger.info("Starting sync of milestones table to BigQuery")
@@ -194,18 +240,25 @@ async def sync_milestones_to_bigquery():
         bq_client = get_bq_client()
         table_id = f"{settings.bq_project_name}.{settings.bq_dataset_name}.{milestones_table_name}"
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id, has_created_at=False)
-        logger.info("Deleted all existing records from BigQuery milestones table")
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table,
+                bq_client,
+                table_id,
+                sqlite_data,
+                has_created_at=False,
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery milestones table"
             )
         else:
-            logger.info("No data to insert into BigQuery milestones table")
+            await asyncio.to_thread(
+                _delete_all_from_bq_table, bq_client, table_id, has_created_at=False
+            )
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery milestones table"
+            )
 
         logger.info("Successfully completed sync of milestones table to BigQuery")
         print("Milestones sync completed successfully!")
@@ -221,8 +274,7 @@ async def sync_course_tasks_to_bigquery():
     Sync course_tasks table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite course_tasks table
-    2. Deletes all existing data from BigQuery course_tasks table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery course_tasks table with the SQLite data
     """
     try:
         logger.info("Starting sync of course_tasks table to BigQuery")
@@ -238,18 +290,19 @@ async def sync_course_tasks_to_bigquery():
         bq_client = get_bq_client()
         table_id = f"{settings.bq_project_name}.{settings.bq_dataset_name}.{course_tasks_table_name}"
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info("Deleted all existing records from BigQuery course_tasks table")
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery course_tasks table"
             )
         else:
-            logger.info("No data to insert into BigQuery course_tasks table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery course_tasks table"
+            )
 
         logger.info("Successfully completed sync of course_tasks table to BigQuery")
         print("Course Tasks sync completed successfully!")
@@ -265,8 +318,7 @@ async def sync_course_milestones_to_bigquery():
     Sync course_milestones table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite course_milestones table
-    2. Deletes all existing data from BigQuery course_milestones table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery course_milestones table with the SQLite data
     """
     try:
         logger.info("Starting sync of course_milestones table to BigQuery")
@@ -282,20 +334,19 @@ async def sync_course_milestones_to_bigquery():
         bq_client = get_bq_client()
         table_id = f"{settings.bq_project_name}.{settings.bq_dataset_name}.{course_milestones_table_name}"
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info(
-            "Deleted all existing records from BigQuery course_milestones table"
-        )
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery course_milestones table"
             )
         else:
-            logger.info("No data to insert into BigQuery course_milestones table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery course_milestones table"
+            )
 
         logger.info(
             "Successfully completed sync of course_milestones table to BigQuery"
@@ -313,8 +364,7 @@ async def sync_organizations_to_bigquery():
     Sync organizations table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite organizations table
-    2. Deletes all existing data from BigQuery organizations table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery organizations table with the SQLite data
     """
     try:
         logger.info("Starting sync of organizations table to BigQuery")
@@ -330,18 +380,19 @@ async def sync_organizations_to_bigquery():
         bq_client = get_bq_client()
         table_id = f"{settings.bq_project_name}.{settings.bq_dataset_name}.{organizations_table_name}"
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info("Deleted all existing records from BigQuery organizations table")
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery organizations table"
             )
         else:
-            logger.info("No data to insert into BigQuery organizations table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery organizations table"
+            )
 
         logger.info("Successfully completed sync of organizations table to BigQuery")
         print("Organizations sync completed successfully!")
@@ -357,8 +408,7 @@ async def sync_scorecards_to_bigquery():
     Sync scorecards table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite scorecards table
-    2. Deletes all existing data from BigQuery scorecards table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery scorecards table with the SQLite data
     """
     try:
         logger.info("Starting sync of scorecards table to BigQuery")
@@ -372,18 +422,19 @@ async def sync_scorecards_to_bigquery():
         bq_client = get_bq_client()
         table_id = f"{settings.bq_project_name}.{settings.bq_dataset_name}.{scorecards_table_name}"
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info("Deleted all existing records from BigQuery scorecards table")
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery scorecards table"
             )
         else:
-            logger.info("No data to insert into BigQuery scorecards table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery scorecards table"
+            )
 
         logger.info("Successfully completed sync of scorecards table to BigQuery")
         print("Scorecards sync completed successfully!")
@@ -399,8 +450,7 @@ async def sync_question_scorecards_to_bigquery():
     Sync question_scorecards table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite question_scorecards table
-    2. Deletes all existing data from BigQuery question_scorecards table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery question_scorecards table with the SQLite data
     """
     try:
         logger.info("Starting sync of question_scorecards table to BigQuery")
@@ -416,20 +466,19 @@ async def sync_question_scorecards_to_bigquery():
         bq_client = get_bq_client()
         table_id = f"{settings.bq_project_name}.{settings.bq_dataset_name}.{question_scorecards_table_name}"
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info(
-            "Deleted all existing records from BigQuery question_scorecards table"
-        )
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery question_scorecards table"
             )
         else:
-            logger.info("No data to insert into BigQuery question_scorecards table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery question_scorecards table"
+            )
 
         logger.info(
             "Successfully completed sync of question_scorecards table to BigQuery"
@@ -447,8 +496,7 @@ async def sync_task_completions_to_bigquery():
     Sync task_completions table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite task_completions table
-    2. Deletes all existing data from BigQuery task_completions table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery task_completions table with the SQLite data
     """
     try:
         logger.info("Starting sync of task_completions table to BigQuery")
@@ -464,18 +512,19 @@ async def sync_task_completions_to_bigquery():
         bq_client = get_bq_client()
         table_id = f"{settings.bq_project_name}.{settings.bq_dataset_name}.{task_completions_table_name}"
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info("Deleted all existing records from BigQuery task_completions table")
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery task_completions table"
             )
         else:
-            logger.info("No data to insert into BigQuery task_completions table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery task_completions table"
+            )
 
         logger.info("Successfully completed sync of task_completions table to BigQuery")
         print("Task Completions sync completed successfully!")
@@ -491,8 +540,7 @@ async def sync_chat_history_to_bigquery():
     Sync chat_history table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite chat_history table
-    2. Deletes all existing data from BigQuery chat_history table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery chat_history table with the SQLite data
     """
     try:
         logger.info("Starting sync of chat_history table to BigQuery")
@@ -511,38 +559,39 @@ async def sync_chat_history_to_bigquery():
 
         # Ensure BigQuery chat_history table has task_id column (added in SQLite)
         try:
-            table = bq_client.get_table(table_id)
+            table = await asyncio.to_thread(bq_client.get_table, table_id)
             field_names = [field.name for field in table.schema]
             if "task_id" not in field_names:
                 new_schema = list(table.schema) + [
                     bigquery.SchemaField("task_id", "INTEGER", mode="NULLABLE")
                 ]
                 table.schema = new_schema
-                bq_client.update_table(table, ["schema"])
+                await asyncio.to_thread(bq_client.update_table, table, ["schema"])
                 logger.info(
                     f"Added task_id column to BigQuery table {table_id} to match SQLite."
                 )
         except NotFound:
-            # If the table doesn't exist, let the delete helper handle it gracefully.
+            # If the table doesn't exist, let the insert helper handle it gracefully.
             print(f"BigQuery table {table_id} not found when ensuring task_id column.")
             logger.info(
                 f"BigQuery table {table_id} not found when ensuring task_id column."
             )
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info("Deleted all existing records from BigQuery chat_history table")
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         print(f"Inserting {len(sqlite_data)} records into BigQuery chat_history table")
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             print(f"Inserted {len(sqlite_data)} records into BigQuery chat_history table")
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery chat_history table"
             )
         else:
-            logger.info("No data to insert into BigQuery chat_history table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery chat_history table"
+            )
 
         logger.info("Successfully completed sync of chat_history table to BigQuery")
         print("Chat History sync completed successfully!")
@@ -558,8 +607,7 @@ async def sync_users_to_bigquery():
     Sync users table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite users table
-    2. Deletes all existing data from BigQuery users table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery users table with the SQLite data
     """
     try:
         logger.info("Starting sync of users table to BigQuery")
@@ -575,18 +623,19 @@ async def sync_users_to_bigquery():
             f"{settings.bq_project_name}.{settings.bq_dataset_name}.{users_table_name}"
         )
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info("Deleted all existing records from BigQuery users table")
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery users table"
             )
         else:
-            logger.info("No data to insert into BigQuery users table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery users table"
+            )
 
         logger.info("Successfully completed sync of users table to BigQuery")
         print("Users sync completed successfully!")
@@ -602,8 +651,7 @@ async def sync_user_cohorts_to_bigquery():
     Sync user_cohorts table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite user_cohorts table
-    2. Deletes all existing data from BigQuery user_cohorts table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery user_cohorts table with the SQLite data
     """
     try:
         logger.info("Starting sync of user_cohorts table to BigQuery")
@@ -621,35 +669,35 @@ async def sync_user_cohorts_to_bigquery():
 
         # Ensure BigQuery table exists with the expected schema
         try:
-            bq_client.get_table(table_id)
+            await asyncio.to_thread(bq_client.get_table, table_id)
         except NotFound:
             logger.info(
                 f"BigQuery table {table_id} not found, creating it with user_cohorts schema."
             )
-            schema = [
-                bigquery.SchemaField("id", "INTEGER", mode="REQUIRED"),
-                bigquery.SchemaField("user_id", "INTEGER", mode="REQUIRED"),
-                bigquery.SchemaField("cohort_id", "INTEGER", mode="REQUIRED"),
-                bigquery.SchemaField("role", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("joined_at", "TIMESTAMP", mode="REQUIRED"),
-                bigquery.SchemaField("updated_at", "TIMESTAMP", mode="NULLABLE"),
-                bigquery.SchemaField("deleted_at", "TIMESTAMP", mode="NULLABLE"),
-            ]
-            table = bigquery.Table(table_id, schema=schema)
-            bq_client.create_table(table)
-
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id, has_created_at=False)
-        logger.info("Deleted all existing records from BigQuery user_cohorts table")
-
-        # Step 4: Insert SQLite data into BigQuery
+            table = bigquery.Table(table_id, schema=_USER_COHORTS_SCHEMA)
+            # cluster on id so point lookups by id only scan the matching blocks
+            table.clustering_fields = ["id"]
+            await asyncio.to_thread(bq_client.create_table, table)
+
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table,
+                bq_client,
+                table_id,
+                sqlite_data,
+                has_created_at=False,
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery user_cohorts table"
             )
         else:
-            logger.info("No data to insert into BigQuery user_cohorts table")
+            await asyncio.to_thread(
+                _delete_all_from_bq_table, bq_client, table_id, has_created_at=False
+            )
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery user_cohorts table"
+            )
 
         logger.info("Successfully completed sync of user_cohorts table to BigQuery")
         print("User Cohorts sync completed successfully!")
@@ -665,8 +713,7 @@ async def sync_tasks_to_bigquery():
     Sync tasks table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite tasks table
-    2. Deletes all existing data from BigQuery tasks table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery tasks table with the SQLite data
     """
     try:
         logger.info("Starting sync of tasks table to BigQuery")
@@ -682,18 +729,19 @@ async def sync_tasks_to_bigquery():
             f"{settings.bq_project_name}.{settings.bq_dataset_name}.{tasks_table_name}"
         )
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info("Deleted all existing records from BigQuery tasks table")
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery tasks table"
             )
         else:
-            logger.info("No data to insert into BigQuery tasks table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery tasks table"
+            )
 
         logger.info("Successfully completed sync of tasks table to BigQuery")
         print("Tasks sync completed successfully!")
@@ -709,8 +757,7 @@ async def sync_questions_to_bigquery():
     Sync questions table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite questions table
-    2. Deletes all existing data from BigQuery questions table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery questions table with the SQLite data
     """
     try:
         logger.info("Starting sync of questions table to BigQuery")
@@ -724,18 +771,19 @@ async def sync_questions_to_bigquery():
         bq_client = get_bq_client()
         table_id = f"{settings.bq_project_name}.{settings.bq_dataset_name}.{questions_table_name}"
 
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info("Deleted all existing records from BigQuery questions table")
-
-        # Step 4: Insert SQLite data into BigQuery
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery questions table"
             )
         else:
-            logger.info("No data to insert into BigQuery questions table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery questions table"
+            )
 
         logger.info("Successfully completed sync of questions table to BigQuery")
         print("Questions sync completed successfully!")
@@ -751,8 +799,7 @@ async def sync_assignments_to_bigquery():
     Sync assignment table from SQLite to BigQuery.
     This method:
     1. Fetches all data from SQLite assignment table
-    2. Deletes all existing data from BigQuery assignment table
-    3. Inserts all SQLite data into BigQuery
+    2. Replaces all existing data in BigQuery assignment table with the SQLite data
     """
     try:
         logger.info("Starting sync of assignment table to BigQuery")
@@ -770,42 +817,29 @@ async def sync_assignments_to_bigquery():
 
         # Ensure BigQuery table exists with the expected schema
         try:
-            bq_client.get_table(table_id)
+            await asyncio.to_thread(bq_client.get_table, table_id)
         except NotFound:
             logger.info(
                 f"BigQuery table {table_id} not found, creating it with assignment schema."
             )
-            schema = [
-                bigquery.SchemaField("id", "INTEGER", mode="REQUIRED"),
-                bigquery.SchemaField("task_id", "INTEGER", mode="REQUIRED"),
-                bigquery.SchemaField("blocks", "STRING", mode="NULLABLE"),
-                bigquery.SchemaField("input_type", "STRING", mode="REQUIRED"),
-                bigquery.SchemaField("response_type", "STRING", mode="NULLABLE"),
-                bigquery.SchemaField("context", "STRING", mode="NULLABLE"),
-                bigquery.SchemaField(
-                    "evaluation_criteria", "STRING", mode="NULLABLE"
-                ),
-                bigquery.SchemaField("max_attempts", "INTEGER", mode="NULLABLE"),
-                bigquery.SchemaField("settings", "STRING", mode="NULLABLE"),
-                bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED"),
-                bigquery.SchemaField("updated_at", "TIMESTAMP", mode="NULLABLE"),
-                bigquery.SchemaField("deleted_at", "TIMESTAMP", mode="NULLABLE"),
-            ]
-            table = bigquery.Table(table_id, schema=schema)
-            bq_client.create_table(table)
-
-        # Step 3: Delete all existing data from BigQuery table
-        _delete_all_from_bq_table(bq_client, table_id)
-        logger.info("Deleted all existing records from BigQuery assignment table")
-
-        # Step 4: Insert SQLite data into BigQuery
+            table = bigquery.Table(table_id, schema=_ASSIGNMENTS_SCHEMA)
+            # cluster on id so point lookups by id only scan the matching blocks
+            table.clustering_fields = ["id"]
+            await asyncio.to_thread(bq_client.create_table, table)
+
+        # Step 3: Replace all existing data in BigQuery table with SQLite data
         if sqlite_data:
-            _insert_data_to_bq_table(bq_client, table_id, sqlite_data)
+            await asyncio.to_thread(
+                _insert_data_to_bq_table, bq_client, table_id, sqlite_data
+            )
             logger.info(
                 f"Inserted {len(sqlite_data)} records into BigQuery assignment table"
             )
         else:
-            logger.info("No data to insert into BigQuery assignment table")
+            await asyncio.to_thread(_delete_all_from_bq_table, bq_client, table_id)
+            logger.info(
+                "No data in SQLite, deleted all existing records from BigQuery assignment table"
+            )
 
         logger.info("Successfully completed sync of assignment table to BigQuery")
         print("Assignment sync completed successfully!")
@@ -816,521 +850,379 @@ async def sync_assignments_to_bigquery():
         raise
 
 
-async def _fetch_org_api_keys_from_sqlite() -> List[Dict[str, Any]]:
-    """Fetch all records from SQLite org_api_keys table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, org_id, hashed_key, created_at 
-            FROM {org_api_keys_table_name}
-            ORDER BY id
-        """
-        )
+# Read-only SQLite connection shared by the _fetch_*_from_sqlite calls while
+# run_all_syncs is running; it is opened and closed by run_all_syncs
+_read_conn: aiosqlite.Connection | None = None
 
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "org_id": row[1],
-                    "hashed_key": row[2],
-                    "created_at": row[3],
-                }
-            )
 
-        return data
+async def _open_read_conn() -> aiosqlite.Connection:
+    """Open a read-only SQLite connection for the _fetch_*_from_sqlite calls"""
+    pending_conn = aiosqlite.connect(f"file:{sqlite_db_path}?mode=ro", uri=True)
+    # like the pooled connections, don't let the worker thread block interpreter exit
+    pending_conn.daemon = True
+    conn = await pending_conn
 
+    try:
+        await conn.execute("PRAGMA query_only=ON")
+        # a larger page cache keeps btree pages hot across the per-table scans
+        await conn.execute("PRAGMA cache_size=-64000")
+    except BaseException:
+        await conn.close()
+        raise
 
-async def _fetch_courses_from_sqlite() -> List[Dict[str, Any]]:
-    """Fetch all records from SQLite courses table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, org_id, name, created_at 
-            FROM {courses_table_name}
-            ORDER BY id
-        """
-        )
+    return conn
 
-        rows = await cursor.fetchall()
 
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {"id": row[0], "org_id": row[1], "name": row[2], "created_at": row[3]}
-            )
+@asynccontextmanager
+async def _read_connection():
+    """
+    Yield the connection shared by the current run_all_syncs, or a connection that
+    is closed on exit when a sync_*_to_bigquery function is called on its own
+    """
+    if _read_conn is not None:
+        yield _read_conn
+        return
 
-        return data
+    conn = await _open_read_conn()
+    try:
+        yield conn
+    finally:
+        await conn.close()
 
 
-async def _fetch_cohorts_from_sqlite() -> List[Dict[str, Any]]:
-    """Fetch all records from SQLite cohorts table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, name, org_id, created_at 
-            FROM {cohorts_table_name}
-            ORDER BY id
-        """
-        )
+def _make_row_converter(fields: Tuple[str, ...]) -> Callable[[list], List[Dict]]:
+    """
+    Build a converter that turns SQLite row tuples into dictionaries.
 
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "name": row[1],
-                    "org_id": row[2],
-                    "created_at": row[3],
-                }
-            )
+    The field names are baked into the generated function as a dict literal with
+    positional indexing, so the per-row work is a single dict construction with no
+    zip or loop over the column names.
+    """
+    body = ", ".join(f"{field!r}: row[{index}]" for index, field in enumerate(fields))
+    source = f"def convert(rows):\n    return [{{{body}}} for row in rows]\n"
+    namespace = {}
+    exec(source, namespace)
+    return namespace["convert"]
+
+
+_ORG_API_KEYS_FIELDS = (
+    "id",
+    "org_id",
+    "hashed_key",
+    "created_at",
+)
+_COURSES_FIELDS = (
+    "id",
+    "org_id",
+    "name",
+    "created_at",
+)
+_COHORTS_FIELDS = (
+    "id",
+    "name",
+    "org_id",
+    "created_at",
+)
+_MILESTONES_FIELDS = (
+    "id",
+    "org_id",
+    "name",
+    "color",
+)
+_COURSE_TASKS_FIELDS = (
+    "id",
+    "task_id",
+    "course_id",
+    "ordering",
+    "created_at",
+    "milestone_id",
+)
+_COURSE_MILESTONES_FIELDS = (
+    "id",
+    "course_id",
+    "milestone_id",
+    "ordering",
+    "created_at",
+)
+_ORGANIZATIONS_FIELDS = (
+    "id",
+    "slug",
+    "name",
+    "default_logo_color",
+    "created_at",
+)
+_SCORECARDS_FIELDS = (
+    "id",
+    "org_id",
+    "title",
+    "criteria",
+    "created_at",
+    "status",
+)
+_QUESTION_SCORECARDS_FIELDS = (
+    "id",
+    "question_id",
+    "scorecard_id",
+    "created_at",
+)
+_TASK_COMPLETIONS_FIELDS = (
+    "id",
+    "user_id",
+    "task_id",
+    "question_id",
+    "created_at",
+)
+_CHAT_HISTORY_FIELDS = (
+    "id",
+    "user_id",
+    "task_id",
+    "question_id",
+    "role",
+    "content",
+    "response_type",
+    "created_at",
+)
+_USERS_FIELDS = (
+    "id",
+    "email",
+    "first_name",
+    "middle_name",
+    "last_name",
+    "default_dp_color",
+    "created_at",
+)
+_USER_COHORTS_FIELDS = (
+    "id",
+    "user_id",
+    "cohort_id",
+    "role",
+    "joined_at",
+)
+_TASKS_FIELDS = (
+    "id",
+    "org_id",
+    "type",
+    "blocks",
+    "title",
+    "status",
+    "created_at",
+    "deleted_at",
+    "scheduled_publish_at",
+)
+_QUESTIONS_FIELDS = (
+    "id",
+    "task_id",
+    "type",
+    "blocks",
+    "answer",
+    "input_type",
+    "coding_language",
+    "generation_model",
+    "response_type",
+    "position",
+    "created_at",
+    "deleted_at",
+    "max_attempts",
+    "is_feedback_shown",
+    "context",
+    "title",
+)
+_ASSIGNMENTS_FIELDS = (
+    "id",
+    "task_id",
+    "blocks",
+    "input_type",
+    "response_type",
+    "context",
+    "evaluation_criteria",
+    "max_attempts",
+    "settings",
+    "created_at",
+)
 
-        return data
+_convert_org_api_keys_rows = _make_row_converter(_ORG_API_KEYS_FIELDS)
+_convert_courses_rows = _make_row_converter(_COURSES_FIELDS)
+_convert_cohorts_rows = _make_row_converter(_COHORTS_FIELDS)
+_convert_milestones_rows = _make_row_converter(_MILESTONES_FIELDS)
+_convert_course_tasks_rows = _make_row_converter(_COURSE_TASKS_FIELDS)
+_convert_course_milestones_rows = _make_row_converter(_COURSE_MILESTONES_FIELDS)
+_convert_organizations_rows = _make_row_converter(_ORGANIZATIONS_FIELDS)
+_convert_scorecards_rows = _make_row_converter(_SCORECARDS_FIELDS)
+_convert_question_scorecards_rows = _make_row_converter(_QUESTION_SCORECARDS_FIELDS)
+_convert_task_completions_rows = _make_row_converter(_TASK_COMPLETIONS_FIELDS)
+_convert_chat_history_rows = _make_row_converter(_CHAT_HISTORY_FIELDS)
+_convert_users_rows = _make_row_converter(_USERS_FIELDS)
+_convert_user_cohorts_rows = _make_row_converter(_USER_COHORTS_FIELDS)
+_convert_tasks_rows = _make_row_converter(_TASKS_FIELDS)
+_convert_questions_rows = _make_row_converter(_QUESTIONS_FIELDS)
+_convert_assignments_rows = _make_row_converter(_ASSIGNMENTS_FIELDS)
+
+_ORG_API_KEYS_QUERY = f"SELECT {', '.join(_ORG_API_KEYS_FIELDS)} FROM {org_api_keys_table_name} ORDER BY id"
+_COURSES_QUERY = (
+    f"SELECT {', '.join(_COURSES_FIELDS)} FROM {courses_table_name} ORDER BY id"
+)
+_COHORTS_QUERY = (
+    f"SELECT {', '.join(_COHORTS_FIELDS)} FROM {cohorts_table_name} ORDER BY id"
+)
+_MILESTONES_QUERY = (
+    f"SELECT {', '.join(_MILESTONES_FIELDS)} FROM {milestones_table_name} ORDER BY id"
+)
+_COURSE_TASKS_QUERY = f"SELECT {', '.join(_COURSE_TASKS_FIELDS)} FROM {course_tasks_table_name} ORDER BY id"
+_COURSE_MILESTONES_QUERY = f"SELECT {', '.join(_COURSE_MILESTONES_FIELDS)} FROM {course_milestones_table_name} ORDER BY id"
+_ORGANIZATIONS_QUERY = f"SELECT {', '.join(_ORGANIZATIONS_FIELDS)} FROM {organizations_table_name} ORDER BY id"
+_SCORECARDS_QUERY = (
+    f"SELECT {', '.join(_SCORECARDS_FIELDS)} FROM {scorecards_table_name} ORDER BY id"
+)
+_QUESTION_SCORECARDS_QUERY = f"SELECT {', '.join(_QUESTION_SCORECARDS_FIELDS)} FROM {question_scorecards_table_name} ORDER BY id"
+_TASK_COMPLETIONS_QUERY = f"SELECT {', '.join(_TASK_COMPLETIONS_FIELDS)} FROM {task_completions_table_name} ORDER BY id"
+_CHAT_HISTORY_QUERY = f"SELECT {', '.join(_CHAT_HISTORY_FIELDS)} FROM {chat_history_table_name} ORDER BY id"
+_USERS_QUERY = f"SELECT {', '.join(_USERS_FIELDS)} FROM {users_table_name} ORDER BY id"
+_USER_COHORTS_QUERY = f"SELECT {', '.join(_USER_COHORTS_FIELDS)} FROM {user_cohorts_table_name} ORDER BY id"
+_TASKS_QUERY = f"SELECT {', '.join(_TASKS_FIELDS)} FROM {tasks_table_name} ORDER BY id"
+_QUESTIONS_QUERY = (
+    f"SELECT {', '.join(_QUESTIONS_FIELDS)} FROM {questions_table_name} ORDER BY id"
+)
+_ASSIGNMENTS_QUERY = (
+    f"SELECT {', '.join(_ASSIGNMENTS_FIELDS)} FROM {assignment_table_name} ORDER BY id"
+)
 
 
-async def _fetch_milestones_from_sqlite() -> List[Dict[str, Any]]:
-    """Fetch all records from SQLite milestones table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, org_id, name, color 
-            FROM {milestones_table_name}
-            ORDER BY id
-        """
-        )
+async def _fetch_converted_rows(
+    cursor: aiosqlite.Cursor, convert: Callable[[list], List[Dict]]
+) -> List[Dict[str, Any]]:
+    """
+    Convert the cursor's rows to dicts FETCH_SIZE rows at a time so only one page of
+    raw SQLite tuples is held alongside the converted records
+    """
+    records = []
 
-        rows = await cursor.fetchall()
+    while rows := await cursor.fetchmany(FETCH_SIZE):
+        records.extend(convert(rows))
 
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {"id": row[0], "org_id": row[1], "name": row[2], "color": row[3]}
-            )
+    return records
 
-        return data
 
+async def _fetch_org_api_keys_from_sqlite() -> List[Dict[str, Any]]:
+    """Fetch all records from SQLite org_api_keys table"""
+    async with _read_connection() as conn:
+        async with conn.execute(_ORG_API_KEYS_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_org_api_keys_rows)
 
-async def _fetch_course_tasks_from_sqlite() -> List[Dict[str, Any]]:
-    """Fetch all records from SQLite course_tasks table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, task_id, course_id, ordering, created_at, milestone_id 
-            FROM {course_tasks_table_name}
-            ORDER BY id
-        """
-        )
 
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "task_id": row[1],
-                    "course_id": row[2],
-                    "ordering": row[3],
-                    "created_at": row[4],
-                    "milestone_id": row[5],
-                }
-            )
+async def _fetch_courses_from_sqlite() -> List[Dict[str, Any]]:
+    """Fetch all records from SQLite courses table"""
+    async with _read_connection() as conn:
+        async with conn.execute(_COURSES_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_courses_rows)
 
-        return data
 
+async def _fetch_cohorts_from_sqlite() -> List[Dict[str, Any]]:
+    """Fetch all records from SQLite cohorts table"""
+    async with _read_connection() as conn:
+        async with conn.execute(_COHORTS_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_cohorts_rows)
 
-async def _fetch_course_milestones_from_sqlite() -> List[Dict[str, Any]]:
-    """Fetch all records from SQLite course_milestones table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, course_id, milestone_id, ordering, created_at 
-            FROM {course_milestones_table_name}
-            ORDER BY id
-        """
-        )
 
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "course_id": row[1],
-                    "milestone_id": row[2],
-                    "ordering": row[3],
-                    "created_at": row[4],
-                }
-            )
+async def _fetch_milestones_from_sqlite() -> List[Dict[str, Any]]:
+    """Fetch all records from SQLite milestones table"""
+    async with _read_connection() as conn:
+        async with conn.execute(_MILESTONES_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_milestones_rows)
 
-        return data
 
+async def _fetch_course_tasks_from_sqlite() -> List[Dict[str, Any]]:
+    """Fetch all records from SQLite course_tasks table"""
+    async with _read_connection() as conn:
+        async with conn.execute(_COURSE_TASKS_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_course_tasks_rows)
 
-async def _fetch_organizations_from_sqlite() -> List[Dict[str, Any]]:
-    """Fetch all records from SQLite organizations table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, slug, name, default_logo_color, created_at 
-            FROM {organizations_table_name}
-            ORDER BY id
-        """
-        )
 
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "slug": row[1],
-                    "name": row[2],
-                    "default_logo_color": row[3],
-                    "created_at": row[4],
-                }
-            )
+async def _fetch_course_milestones_from_sqlite() -> List[Dict[str, Any]]:
+    """Fetch all records from SQLite course_milestones table"""
+    async with _read_connection() as conn:
+        async with conn.execute(_COURSE_MILESTONES_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_course_milestones_rows)
+
 
-        return data
+async def _fetch_organizations_from_sqlite() -> List[Dict[str, Any]]:
+    """Fetch all records from SQLite organizations table"""
+    async with _read_connection() as conn:
+        async with conn.execute(_ORGANIZATIONS_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_organizations_rows)
 
 
 async def _fetch_scorecards_from_sqlite() -> List[Dict[str, Any]]:
     """Fetch all records from SQLite scorecards table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, org_id, title, criteria, created_at, status 
-            FROM {scorecards_table_name}
-            ORDER BY id
-        """
-        )
-
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "org_id": row[1],
-                    "title": row[2],
-                    "criteria": row[3],
-                    "created_at": row[4],
-                    "status": row[5],
-                }
-            )
-
-        return data
+    async with _read_connection() as conn:
+        async with conn.execute(_SCORECARDS_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_scorecards_rows)
 
 
 async def _fetch_question_scorecards_from_sqlite() -> List[Dict[str, Any]]:
     """Fetch all records from SQLite question_scorecards table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, question_id, scorecard_id, created_at 
-            FROM {question_scorecards_table_name}
-            ORDER BY id
-        """
-        )
-
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "question_id": row[1],
-                    "scorecard_id": row[2],
-                    "created_at": row[3],
-                }
+    async with _read_connection() as conn:
+        async with conn.execute(_QUESTION_SCORECARDS_QUERY) as cursor:
+            return await _fetch_converted_rows(
+                cursor, _convert_question_scorecards_rows
             )
 
-        return data
-
 
 async def _fetch_task_completions_from_sqlite() -> List[Dict[str, Any]]:
     """Fetch all records from SQLite task_completions table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, user_id, task_id, question_id, created_at 
-            FROM {task_completions_table_name}
-            ORDER BY id
-        """
-        )
-
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "user_id": row[1],
-                    "task_id": row[2],
-                    "question_id": row[3],
-                    "created_at": row[4],
-                }
-            )
-
-        return data
+    async with _read_connection() as conn:
+        async with conn.execute(_TASK_COMPLETIONS_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_task_completions_rows)
 
 
 async def _fetch_chat_history_from_sqlite() -> List[Dict[str, Any]]:
     """Fetch all records from SQLite chat_history table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, user_id, task_id, question_id, role, content, response_type, created_at 
-            FROM {chat_history_table_name}
-            ORDER BY id
-        """
-        )
-
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "user_id": row[1],
-                    "task_id": row[2],
-                    "question_id": row[3],
-                    "role": row[4],
-                    "content": row[5],
-                    "response_type": row[6],
-                    "created_at": row[7],
-                }
-            )
-
-        return data
+    async with _read_connection() as conn:
+        async with conn.execute(_CHAT_HISTORY_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_chat_history_rows)
 
 
 async def _fetch_users_from_sqlite() -> List[Dict[str, Any]]:
     """Fetch all records from SQLite users table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, email, first_name, middle_name, last_name, default_dp_color, created_at 
-            FROM {users_table_name}
-            ORDER BY id
-        """
-        )
-
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "email": row[1],
-                    "first_name": row[2],
-                    "middle_name": row[3],
-                    "last_name": row[4],
-                    "default_dp_color": row[5],
-                    "created_at": row[6],
-                }
-            )
-
-        return data
+    async with _read_connection() as conn:
+        async with conn.execute(_USERS_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_users_rows)
 
 
 async def _fetch_user_cohorts_from_sqlite() -> List[Dict[str, Any]]:
     """Fetch all records from SQLite user_cohorts table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, user_id, cohort_id, role, joined_at 
-            FROM {user_cohorts_table_name}
-            ORDER BY id
-        """
-        )
-
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "user_id": row[1],
-                    "cohort_id": row[2],
-                    "role": row[3],
-                    "joined_at": row[4],
-                }
-            )
-
-        return data
+    async with _read_connection() as conn:
+        async with conn.execute(_USER_COHORTS_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_user_cohorts_rows)
 
 
 async def _fetch_tasks_from_sqlite() -> List[Dict[str, Any]]:
     """Fetch all records from SQLite tasks table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, org_id, type, blocks, title, status, created_at, deleted_at, scheduled_publish_at 
-            FROM {tasks_table_name}
-            ORDER BY id
-        """
-        )
-
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "org_id": row[1],
-                    "type": row[2],
-                    "blocks": row[3],
-                    "title": row[4],
-                    "status": row[5],
-                    "created_at": row[6],
-                    "deleted_at": row[7],
-                    "scheduled_publish_at": row[8],
-                }
-            )
-
-        return data
+    async with _read_connection() as conn:
+        async with conn.execute(_TASKS_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_tasks_rows)
 
 
 async def _fetch_questions_from_sqlite() -> List[Dict[str, Any]]:
     """Fetch all records from SQLite questions table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, task_id, type, blocks, answer, input_type, coding_language, 
-                   generation_model, response_type, position, created_at, deleted_at, 
-                   max_attempts, is_feedback_shown, context, title 
-            FROM {questions_table_name}
-            ORDER BY id
-        """
-        )
-
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "task_id": row[1],
-                    "type": row[2],
-                    "blocks": row[3],
-                    "answer": row[4],
-                    "input_type": row[5],
-                    "coding_language": row[6],
-                    "generation_model": row[7],
-                    "response_type": row[8],
-                    "position": row[9],
-                    "created_at": row[10],
-                    "deleted_at": row[11],
-                    "max_attempts": row[12],
-                    "is_feedback_shown": row[13],
-                    "context": row[14],
-                    "title": row[15],
-                }
-            )
-
-        return data
+    async with _read_connection() as conn:
+        async with conn.execute(_QUESTIONS_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_questions_rows)
 
 
 async def _fetch_assignments_from_sqlite() -> List[Dict[str, Any]]:
     """Fetch all records from SQLite assignment table"""
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-
-        await cursor.execute(
-            f"""
-            SELECT id, task_id, blocks, input_type, response_type, context, 
-                   evaluation_criteria, max_attempts, settings, created_at 
-            FROM {assignment_table_name}
-            ORDER BY id
-        """
-        )
-
-        rows = await cursor.fetchall()
-
-        # Convert rows to list of dictionaries
-        data = []
-        for row in rows:
-            data.append(
-                {
-                    "id": row[0],
-                    "task_id": row[1],
-                    "blocks": row[2],
-                    "input_type": row[3],
-                    "response_type": row[4],
-                    "context": row[5],
-                    "evaluation_criteria": row[6],
-                    "max_attempts": row[7],
-                    "settings": row[8],
-                    "created_at": row[9],
-                }
-            )
-
-        return data
+    async with _read_connection() as conn:
+        async with conn.execute(_ASSIGNMENTS_QUERY) as cursor:
+            return await _fetch_converted_rows(cursor, _convert_assignments_rows)
 
 
 def _delete_all_from_bq_table(
     bq_client: bigquery.Client, table_id: str, has_created_at: bool = True
 ):
-    """Delete all records from BigQuery table"""
+    """
+    Delete the records a sync replaces from BigQuery table; rows created before
+    2024 are kept unless the table has no created_at column
+    """
     if has_created_at:
         if org_api_keys_table_name in table_id:
             query = f"DELETE FROM `{table_id}` WHERE TRUE AND created_at > DATETIME('2024-01-01 00:00:00')"
@@ -1350,10 +1242,42 @@ def _delete_all_from_bq_table(
         logger.info(f"BigQuery table {table_id} not found while deleting, skipping.")
 
 
+def _write_rows_as_gzipped_ndjson(data: List[Dict[str, Any]], file: BinaryIO):
+    """
+    Write rows to the given file as gzip-compressed newline-delimited JSON,
+    CHUNK_SIZE rows per write to amortize the per-call compressor overhead
+    """
+    with gzip.GzipFile(fileobj=file, mode="wb") as gzip_file:
+        for start in range(0, len(data), CHUNK_SIZE):
+            chunk = data[start : start + CHUNK_SIZE]
+            gzip_file.write(b"\n".join(map(orjson.dumps, chunk)))
+            gzip_file.write(b"\n")
+
+    file.seek(0)
+
+
+@backoff.on_exception(
+    backoff.expo,
+    (ServerError, TooManyRequests),
+    max_tries=6,
+    jitter=backoff.full_jitter,
+)
 def _insert_data_to_bq_table(
-    bq_client: bigquery.Client, table_id: str, data: List[Dict[str, Any]]
+    bq_client: bigquery.Client,
+    table_id: str,
+    data: List[Dict[str, Any]],
+    has_created_at: bool = True,
 ):
-    """Insert data into BigQuery table"""
+    """
+    Replace the synced data in BigQuery table with the given rows.
+
+    The rows the sync owns are deleted with _delete_all_from_bq_table, so the
+    empty-data path and this one keep the same rows, and the new rows are then
+    staged as a gzip-compressed newline-delimited JSON file and appended in a
+    single load job. Transient server and rate limit errors are retried with
+    exponential backoff; the delete is part of every attempt, so a retry never
+    appends the rows twice.
+    """
     # Use existing table schema in BigQuery (no autodetect).
     try:
         table = bq_client.get_table(table_id)
@@ -1361,17 +1285,24 @@ def _insert_data_to_bq_table(
         logger.info(f"BigQuery table {table_id} not found while inserting, skipping.")
         return
 
+    _delete_all_from_bq_table(bq_client, table_id, has_created_at)
+
     # Configure the job to append data and ignore unknown values
     job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+        schema=table.schema,
         write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
         ignore_unknown_values=True,
     )
 
-    # Insert the data
-    job = bq_client.load_table_from_json(data, table, job_config=job_config)
+    with tempfile.TemporaryFile() as file:
+        _write_rows_as_gzipped_ndjson(data, file)
 
-    # Wait for the job to complete
-    job.result()
+        # Insert the data
+        job = bq_client.load_table_from_file(file, table, job_config=job_config)
+
+        # Wait for the job to complete
+        job.result()
 
     if job.errors:
         raise Exception(f"BigQuery insert job failed with errors: {job.errors}")
@@ -1380,9 +1311,11 @@ def _insert_data_to_bq_table(
 # Example usage / test function
 async def run_all_syncs():
     """
-    Run all table syncs in sequence.
+    Run all table syncs concurrently, at most MAX_CONCURRENT_TABLE_SYNCS at a time.
     This can be called from a cron job to sync all tables at once.
     """
+    global _read_conn
+
     sync_id = None
     try:
         # Record start of the full BigQuery sync
@@ -1394,22 +1327,46 @@ async def run_all_syncs():
             sync_id = cursor.lastrowid
             await conn.commit()
 
-        await sync_org_api_keys_to_bigquery()
-        await sync_courses_to_bigquery()
-        await sync_cohorts_to_bigquery()
-        await sync_milestones_to_bigquery()
-        await sync_course_tasks_to_bigquery()
-        await sync_course_milestones_to_bigquery()
-        await sync_organizations_to_bigquery()
-        await sync_scorecards_to_bigquery()
-        await sync_question_scorecards_to_bigquery()
-        await sync_task_completions_to_bigquery()
-        await sync_chat_history_to_bigquery()
-        await sync_users_to_bigquery()
-        await sync_user_cohorts_to_bigquery()
-        await sync_tasks_to_bigquery()
-        await sync_questions_to_bigquery()
-        await sync_assignments_to_bigquery()
+        # Read every table through one connection for the whole run. There is no
+        # transaction spanning the tables: each SELECT only holds its own read
+        # snapshot while it is being fetched, so no WAL snapshot stays pinned
+        # through the BigQuery uploads and checkpoints can keep up
+        _read_conn = await _open_read_conn()
+
+        table_syncs = [
+            sync_org_api_keys_to_bigquery,
+            sync_courses_to_bigquery,
+            sync_cohorts_to_bigquery,
+            sync_milestones_to_bigquery,
+            sync_course_tasks_to_bigquery,
+            sync_course_milestones_to_bigquery,
+            sync_organizations_to_bigquery,
+            sync_scorecards_to_bigquery,
+            sync_question_scorecards_to_bigquery,
+            sync_task_completions_to_bigquery,
+            sync_chat_history_to_bigquery,
+            sync_users_to_bigquery,
+            sync_user_cohorts_to_bigquery,
+            sync_tasks_to_bigquery,
+            sync_questions_to_bigquery,
+            sync_assignments_to_bigquery,
+        ]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_TABLE_SYNCS)
+
+        async def run_table_sync(table_sync):
+            async with semaphore:
+                await table_sync()
+
+        # The tables are independent, so sync them concurrently and let every sync
+        # run to completion before surfacing the first failure, if any
+        results = await asyncio.gather(
+            *(run_table_sync(table_sync) for table_sync in table_syncs),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
+
         print("All table syncs completed successfully!")
     except Exception as e:
         print(f"Table sync failed: {str(e)}")
@@ -1429,10 +1386,12 @@ async def run_all_syncs():
             # Avoid masking the original exception if any
             pass
 
+        if _read_conn is not None:
+            await _read_conn.close()
+            _read_conn = None
+
 
 # If running this file directly for testing
 if __name__ == "__main__":
-    import asyncio
-
     # Run all syncs at once
     asyncio.run(run_all_syncs())
@@ -1,13 +1,21 @@
 from google.cloud import bigquery
 import hashlib
+from aiocache import SimpleMemoryCache
 from api.settings import settings
 from api.config import org_api_keys_table_name
 from api.bq.base import get_bq_client
 
+# Whether a hashed API key is valid, so repeat requests with the same key skip
+# BigQuery. Keys only reach BigQuery through the separately run table sync, so
+# this process can't invalidate an entry when a key is created or revoked; the
+# short TTLs bound how long a revoked key keeps working, or a newly synced key
+# keeps being rejected, after the sync has landed.
+api_key_cache = SimpleMemoryCache()
+VALID_API_KEY_CACHE_TTL = 60
+INVALID_API_KEY_CACHE_TTL = 15
 
-async def get_org_id_from_api_key(api_key: str) -> int:
-    bq_client = get_bq_client()
 
+async def get_org_id_from_api_key(api_key: str) -> int:
     api_key_parts = api_key.split("__")
 
     if len(api_key_parts) < 3:
@@ -21,24 +29,40 @@ async def get_org_id_from_api_key(api_key: str) -> int:
     # Hash the full API key
     hashed_key = hashlib.sha256(api_key.encode()).hexdigest()
 
+    is_valid = await api_key_cache.get(hashed_key)
+
+    if is_valid is None:
+        is_valid = _is_api_key_in_bq(org_id, hashed_key)
+        await api_key_cache.set(
+            hashed_key,
+            is_valid,
+            ttl=VALID_API_KEY_CACHE_TTL if is_valid else INVALID_API_KEY_CACHE_TTL,
+        )
+
+    if not is_valid:
+        raise ValueError("Invalid API key")
+
+    return org_id
+
+
+def _is_api_key_in_bq(org_id: int, hashed_key: str) -> bool:
+    bq_client = get_bq_client()
+
     query = f"""
-        SELECT hashed_key
+        SELECT 1
         FROM `{settings.bq_project_name}.{settings.bq_dataset_name}.{org_api_keys_table_name}`
-        WHERE org_id = @org_id AND created_at > DATETIME('2024-01-01 00:00:00')
+        WHERE org_id = @org_id AND hashed_key = @hashed_key AND created_at > DATETIME('2024-01-01 00:00:00')
+        LIMIT 1
     """
 
     job_config = bigquery.QueryJobConfig(
-        query_parameters=[bigquery.ScalarQueryParameter("org_id", "INT64", org_id)]
+        query_parameters=[
+            bigquery.ScalarQueryParameter("org_id", "INT64", org_id),
+            bigquery.ScalarQueryParameter("hashed_key", "STRING", hashed_key),
+        ]
     )
 
     query_job = bq_client.query(query, job_config=job_config)
     rows = list(query_job.result())
 
-    if not rows:
-        raise ValueError("Invalid API key")
-
-    for row in rows:
-        if hashed_key == row["hashed_key"]:
-            return org_id
-
-    raise ValueError("Invalid API key")
+    return bool(rows)
@@ -1,6 +1,6 @@
 from google.cloud import bigquery
-import json
-from typing import Dict
+import orjson
+from typing import Dict, List
 from api.settings import settings
 from api.config import (
     tasks_table_name,
@@ -31,16 +31,47 @@ async def get_scorecard(scorecard_id: int) -> Dict:
     )
 
     query_job = bq_client.query(query, job_config=job_config)
-    rows = list(query_job.result())
+    scorecard = next(iter(query_job.result(max_results=1)), None)
 
-    if not rows:
+    if not scorecard:
         return None
 
-    scorecard = rows[0]
+    return convert_scorecard_bq_to_dict(scorecard)
+
+
+async def get_scorecards(scorecard_ids: List[int]) -> Dict[int, Dict]:
+    if not scorecard_ids:
+        return {}
+
+    bq_client = get_bq_client()
+
+    query = f"""
+        SELECT id, title, criteria, status
+        FROM `{settings.bq_project_name}.{settings.bq_dataset_name}.{scorecards_table_name}`
+        WHERE id IN UNNEST(@scorecard_ids) AND created_at > TIMESTAMP('2024-01-01 00:00:00')
+    """
+
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ArrayQueryParameter("scorecard_ids", "INT64", scorecard_ids)
+        ]
+    )
+
+    query_job = bq_client.query(query, job_config=job_config)
+
+    return {
+        scorecard["id"]: convert_scorecard_bq_to_dict(scorecard)
+        for scorecard in query_job.result()
+    }
+
+
+def convert_scorecard_bq_to_dict(scorecard) -> Dict:
     return {
         "id": scorecard["id"],
         "title": scorecard["title"],
-        "criteria": json.loads(scorecard["criteria"]) if scorecard["criteria"] else [],
+        "criteria": (
+            orjson.loads(scorecard["criteria"]) if scorecard["criteria"] else []
+        ),
         "status": scorecard["status"],
     }
 
@@ -49,14 +80,14 @@ def convert_question_bq_to_dict(question) -> Dict:
     result = {
         "id": question["id"],
         "type": question["type"],
-        "blocks": json.loads(question["blocks"]) if question["blocks"] else [],
-        "answer": json.loads(question["answer"]) if question["answer"] else None,
+        "blocks": orjson.loads(question["blocks"]) if question["blocks"] else [],
+        "answer": orjson.loads(question["answer"]) if question["answer"] else None,
         "input_type": question["input_type"],
         "response_type": question["response_type"],
         "scorecard_id": question["scorecard_id"],
-        "context": json.loads(question["context"]) if question["context"] else None,
+        "context": orjson.loads(question["context"]) if question["context"] else None,
         "coding_languages": (
-            json.loads(question["coding_language"])
+            orjson.loads(question["coding_language"])
             if question["coding_language"]
             else None
         ),
@@ -81,12 +112,15 @@ async def get_basic_task_details(task_id: int) -> Dict:
     )
 
     query_job = bq_client.query(query, job_config=job_config)
-    rows = list(query_job.result())
+    task = next(iter(query_job.result(max_results=1)), None)
 
-    if not rows:
+    if not task:
         return None
 
-    task = rows[0]
+    return convert_basic_task_bq_to_dict(task)
+
+
+def convert_basic_task_bq_to_dict(task) -> Dict:
     return {
         "id": task["id"],
         "title": task["title"],
@@ -98,33 +132,29 @@ async def get_basic_task_details(task_id: int) -> Dict:
 
 
 async def get_task(task_id: int):
-    task_data = await get_basic_task_details(task_id)
+    bq_client = get_bq_client()
 
-    if not task_data:
-        return None
+    # Fetch the basic task details and the blocks of a learning material together
+    query = f"""
+        SELECT id, title, type, status, org_id, scheduled_publish_at, blocks
+        FROM `{settings.bq_project_name}.{settings.bq_dataset_name}.{tasks_table_name}`
+        WHERE id = @task_id AND deleted_at IS NULL AND created_at > TIMESTAMP('2024-01-01 00:00:00')
+    """
 
-    bq_client = get_bq_client()
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[bigquery.ScalarQueryParameter("task_id", "INT64", task_id)]
+    )
 
-    if task_data["type"] == TaskType.LEARNING_MATERIAL:
-        query = f"""
-            SELECT blocks
-            FROM `{settings.bq_project_name}.{settings.bq_dataset_name}.{tasks_table_name}`
-            WHERE id = @task_id AND created_at > TIMESTAMP('2024-01-01 00:00:00')
-        """
+    query_job = bq_client.query(query, job_config=job_config)
+    task = next(iter(query_job.result(max_results=1)), None)
 
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("task_id", "INT64", task_id)
-            ]
-        )
+    if not task:
+        return None
 
-        query_job = bq_client.query(query, job_config=job_config)
-        rows = list(query_job.result())
+    task_data = convert_basic_task_bq_to_dict(task)
 
-        if rows:
-            task_data["blocks"] = (
-                json.loads(rows[0]["blocks"]) if rows[0]["blocks"] else []
-            )
+    if task_data["type"] == TaskType.LEARNING_MATERIAL:
+        task_data["blocks"] = orjson.loads(task["blocks"]) if task["blocks"] else []
 
     elif task_data["type"] == TaskType.QUIZ:
         questions_query = f"""
@@ -147,18 +177,24 @@ async def get_task(task_id: int):
         query_job = bq_client.query(questions_query, job_config=job_config)
         questions = list(query_job.result())
 
-        task_questions = []
-        for question in questions:
-            question_dict = convert_question_bq_to_dict(question)
+        task_questions = [
+            convert_question_bq_to_dict(question) for question in questions
+        ]
 
-            # Get scorecard if exists
+        # Fetch the scorecards of all the questions in a single query
+        scorecard_ids = {
+            question_dict["scorecard_id"]
+            for question_dict in task_questions
+            if question_dict["scorecard_id"] is not None
+        }
+        scorecards = await get_scorecards(list(scorecard_ids))
+
+        for question_dict in task_questions:
             if question_dict["scorecard_id"] is not None:
-                question_dict["scorecard"] = await get_scorecard(
+                question_dict["scorecard"] = scorecards.get(
                     question_dict["scorecard_id"]
                 )
 
-            task_questions.append(question_dict)
-
         task_data["questions"] = task_questions
 
     return task_data
@@ -1,5 +1,6 @@
-import subprocess
-from typing import Dict
+import asyncio
+import os
+from typing import Dict, Optional
 from api.db.analytics import get_usage_summary_by_organization
 from api.slack import send_slack_notification_for_usage_stats
 from api.settings import settings
@@ -14,16 +15,18 @@ async def send_usage_summary_stats():
     then sends a formatted summary to a Slack channel via webhook.
     """
     try:
-        # Get usage statistics for different time periods
-        last_week_stats = {
-            "org": await get_usage_summary_by_organization("last_week"),
-        }
-        current_month_stats = {
-            "org": await get_usage_summary_by_organization("current_month"),
-        }
-        current_year_stats = {
-            "org": await get_usage_summary_by_organization("current_year"),
-        }
+        # Get usage statistics for different time periods concurrently
+        last_week_org_stats, current_month_org_stats, current_year_org_stats = (
+            await asyncio.gather(
+                get_usage_summary_by_organization("last_week"),
+                get_usage_summary_by_organization("current_month"),
+                get_usage_summary_by_organization("current_year"),
+            )
+        )
+
+        last_week_stats = {"org": last_week_org_stats}
+        current_month_stats = {"org": current_month_org_stats}
+        current_year_stats = {"org": current_year_org_stats}
 
         # Send the statistics via Slack webhook
         await send_slack_notification_for_usage_stats(
@@ -35,23 +38,21 @@ async def send_usage_summary_stats():
         raise
 
 
+def get_available_memory() -> Optional[float]:
+    # Free space (in GB) on the root filesystem available to unprivileged users;
+    # None if it can't be read
+    try:
+        stats = os.statvfs("/")
+    except OSError:
+        return None
+
+    return (stats.f_bavail * stats.f_frsize) / (1024**3)
+
+
 async def check_memory_and_raise_alert():
     if not settings.slack_alert_webhook_url:
         return
 
-    def get_available_memory():
-        # Run df -h and parse output
-        result = subprocess.run(["df", "-h"], stdout=subprocess.PIPE, text=True)
-        lines = result.stdout.splitlines()
-
-        for line in lines:
-            if line.startswith("overlay"):
-                parts = line.split()
-                avail_str = parts[3]  # Avail column (e.g. '132G')
-                if avail_str.lower().endswith("g"):
-                    avail_gb = float(avail_str[:-1])
-                    return avail_gb
-
     avail_gb = get_available_memory()
 
     if avail_gb is None:
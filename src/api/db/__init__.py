@@ -367,6 +367,7 @@ async def create_integrations_table(cursor):
             CREATE TRIGGER {update_trigger_name}
             AFTER UPDATE ON {integrations_table_name}
             FOR EACH ROW
+            WHEN NEW.updated_at IS OLD.updated_at
             BEGIN
                 UPDATE {integrations_table_name} 
                 SET updated_at = CURRENT_TIMESTAMP 
@@ -458,6 +459,7 @@ async def create_assignment_table(cursor):
         CREATE TRIGGER {trigger_name}
         AFTER UPDATE ON {assignment_table_name}
         FOR EACH ROW
+        WHEN NEW.updated_at IS OLD.updated_at
         BEGIN
             UPDATE {assignment_table_name}
             SET updated_at = CURRENT_TIMESTAMP
@@ -543,6 +545,11 @@ async def create_chat_history_table(cursor):
         f"""CREATE INDEX idx_chat_history_question_id ON {chat_history_table_name} (question_id)"""
     )
 
+    # Covers the per-user activity dates read by the cohort streak query
+    await cursor.execute(
+        f"""CREATE INDEX IF NOT EXISTS idx_chat_history_question_user_created_at ON {chat_history_table_name} (question_id, user_id, created_at)"""
+    )
+
 
 async def create_task_completion_table(cursor):
     await cursor.execute(
@@ -574,6 +581,11 @@ async def create_task_completion_table(cursor):
         f"""CREATE INDEX idx_task_completion_question_id ON {task_completions_table_name} (question_id)"""
     )
 
+    # Covers the per-user activity dates read by the cohort streak query
+    await cursor.execute(
+        f"""CREATE INDEX IF NOT EXISTS idx_task_completion_task_user_created_at ON {task_completions_table_name} (task_id, user_id, created_at)"""
+    )
+
 
 async def create_course_generation_jobs_table(cursor):
     await cursor.execute(
@@ -14,10 +14,10 @@ from api.config import (
     user_batches_table_name,
 )
 from api.models import LeaderboardViewType, TaskType, TaskStatus
-from api.db.user import get_user_streak_from_usage_dates
 from aiocache import cached, SimpleMemoryCache
 
 
+@cached(ttl=300, cache=SimpleMemoryCache)
 async def get_usage_summary_by_organization(
     filter_period: Optional[str] = None,
 ) -> List[Dict]:
@@ -94,70 +94,36 @@ async def get_cohort_completion(
     #     results[user_id] = {}
     #     continue
 
-    # Get completed tasks for the users from task_completions_table
-    completed_tasks = await execute_db_operation(
-        f"""
-        SELECT user_id, task_id 
-        FROM {task_completions_table_name}
-        WHERE user_id in ({','.join(map(str, user_ids))}) AND task_id IS NOT NULL
-        """,
-        fetch_all=True,
-    )
-    completed_task_ids_for_user = defaultdict(set)
-    for user_id, task_id in completed_tasks:
-        completed_task_ids_for_user[user_id].add(task_id)
+    user_id_placeholders = ", ".join(["?" for _ in user_ids])
 
-    # Get completed questions for the users from task_completions_table
-    completed_questions = await execute_db_operation(
+    # Get completed tasks and questions for the users from task_completions_table
+    completions = await execute_db_operation(
         f"""
-        SELECT user_id, question_id 
+        SELECT user_id, task_id, question_id
         FROM {task_completions_table_name}
-        WHERE user_id in ({','.join(map(str, user_ids))}) AND question_id IS NOT NULL
+        WHERE user_id in ({user_id_placeholders})
         """,
+        tuple(user_ids),
         fetch_all=True,
     )
+    completed_task_ids_for_user = defaultdict(set)
     completed_question_ids_for_user = defaultdict(set)
-    for user_id, question_id in completed_questions:
-        completed_question_ids_for_user[user_id].add(question_id)
-
-    # Get all tasks for the cohort
-    # Get learning material and assignment tasks
-    query = f"""
-        SELECT DISTINCT t.id
-        FROM {tasks_table_name} t
-        JOIN {course_tasks_table_name} ct ON t.id = ct.task_id
-        JOIN {course_cohorts_table_name} cc ON ct.course_id = cc.course_id
-        WHERE cc.cohort_id = ? AND t.deleted_at IS NULL AND t.type IN ('{TaskType.LEARNING_MATERIAL}', '{TaskType.ASSIGNMENT}') AND t.status = '{TaskStatus.PUBLISHED}' AND t.scheduled_publish_at IS NULL
-        """
-    params = (cohort_id,)
-
-    if course_id is not None:
-        query += " AND ct.course_id = ?"
-        params += (course_id,)
-
-    learning_material_and_assignment_tasks = await execute_db_operation(
-        query,
-        params,
-        fetch_all=True,
-    )
+    for user_id, task_id, question_id in completions:
+        if task_id is not None:
+            completed_task_ids_for_user[user_id].add(task_id)
+        if question_id is not None:
+            completed_question_ids_for_user[user_id].add(question_id)
 
-    for user_id in user_ids:
-        for task in learning_material_and_assignment_tasks:
-            # For learning material and assignment tasks, check if it's in the completed tasks list
-            results[user_id][task[0]] = {
-                "is_complete": task[0] in completed_task_ids_for_user[user_id]
-            }
-
-    # Get quiz and exam task questions
+    # Get all published tasks for the cohort along with the questions of quiz tasks
     query = f"""
-        SELECT DISTINCT t.id as task_id, q.id as question_id
+        SELECT DISTINCT t.id as task_id, t.type, q.id as question_id
         FROM {tasks_table_name} t
         JOIN {course_tasks_table_name} ct ON t.id = ct.task_id
         JOIN {course_cohorts_table_name} cc ON ct.course_id = cc.course_id
-        LEFT JOIN {questions_table_name} q ON t.id = q.task_id AND q.deleted_at IS NULL
-        WHERE cc.cohort_id = ? AND t.deleted_at IS NULL AND t.type = '{TaskType.QUIZ}' AND t.status = '{TaskStatus.PUBLISHED}' AND t.scheduled_publish_at IS NULL{
-            " AND ct.course_id = ?" if course_id else ""
-        } 
+        LEFT JOIN {questions_table_name} q ON t.id = q.task_id AND q.deleted_at IS NULL AND t.type = '{TaskType.QUIZ}'
+        WHERE cc.cohort_id = ? AND t.deleted_at IS NULL AND t.type IN ('{TaskType.LEARNING_MATERIAL}', '{TaskType.ASSIGNMENT}', '{TaskType.QUIZ}') AND t.status = '{TaskStatus.PUBLISHED}' AND t.scheduled_publish_at IS NULL{
+            " AND ct.course_id = ?" if course_id is not None else ""
+        }
         ORDER BY t.id, q.position ASC
         """
     params = (cohort_id,)
@@ -165,43 +131,54 @@ async def get_cohort_completion(
     if course_id is not None:
         params += (course_id,)
 
-    quiz_exam_questions = await execute_db_operation(
+    cohort_tasks = await execute_db_operation(
         query,
         params,
         fetch_all=True,
     )
 
-    # Group questions by task_id
+    # Split learning material and assignment tasks from quiz questions grouped by task_id
+    learning_material_and_assignment_task_ids = []
     quiz_exam_tasks = defaultdict(list)
-    for row in quiz_exam_questions:
-        task_id = row[0]
-        question_id = row[1]
+    for task_id, task_type, question_id in cohort_tasks:
+        if task_type == TaskType.QUIZ:
+            quiz_exam_tasks[task_id].append(question_id)
+        else:
+            learning_material_and_assignment_task_ids.append(task_id)
 
-        quiz_exam_tasks[task_id].append(question_id)
+    if learning_material_and_assignment_task_ids:
+        for user_id in user_ids:
+            # For learning material and assignment tasks, check if it's in the completed tasks list
+            completed_task_ids = completed_task_ids_for_user[user_id]
+            results[user_id].update(
+                {
+                    task_id: {"is_complete": task_id in completed_task_ids}
+                    for task_id in learning_material_and_assignment_task_ids
+                }
+            )
+
+    quiz_exam_task_question_ids = {
+        task_id: set(question_ids) for task_id, question_ids in quiz_exam_tasks.items()
+    }
 
     for user_id in user_ids:
-        for task_id in quiz_exam_tasks:
-            is_task_complete = True
-            question_completions = []
+        completed_question_ids = completed_question_ids_for_user[user_id]
 
-            for question_id in quiz_exam_tasks[task_id]:
-                is_question_complete = (
-                    question_id in completed_question_ids_for_user[user_id]
-                )
+        for task_id, question_ids in quiz_exam_tasks.items():
+            # A quiz is complete when all of its questions have been completed
+            is_task_complete = (
+                quiz_exam_task_question_ids[task_id] <= completed_question_ids
+            )
 
-                question_completions.append(
+            results[user_id][task_id] = {
+                "is_complete": is_task_complete,
+                "questions": [
                     {
                         "question_id": question_id,
-                        "is_complete": is_question_complete,
+                        "is_complete": question_id in completed_question_ids,
                     }
-                )
-
-                if not is_question_complete:
-                    is_task_complete = False
-
-            results[user_id][task_id] = {
-                "is_complete": is_task_complete,
-                "questions": question_completions,
+                    for question_id in question_ids
+                ],
             }
 
     return results
@@ -233,55 +210,34 @@ async def get_cohort_course_attempt_data(cohort_learner_ids: List[int], course_i
             }
         }
     """
-    result = defaultdict(dict)
-
-    # Initialize result structure with all courses for all users
-    for user_id in cohort_learner_ids:
-        result[user_id][course_id] = {
-            "has_attempted": False,
-        }
+    cohort_learner_id_placeholders = ", ".join(["?" for _ in cohort_learner_ids])
 
-    cohort_learner_ids_str = ",".join(map(str, cohort_learner_ids))
-
-    # Get all learning material tasks attempted for this course
-    task_completions = await execute_db_operation(
+    # Get the users who have either completed a task in this course or sent a
+    # message for one of its questions
+    attempted_users = await execute_db_operation(
         f"""
-        SELECT DISTINCT tc.user_id
+        SELECT tc.user_id
         FROM {task_completions_table_name} tc
         JOIN {course_tasks_table_name} ct ON tc.task_id = ct.task_id
-        WHERE tc.user_id IN ({cohort_learner_ids_str}) AND ct.course_id = ?
-        ORDER BY tc.created_at ASC
-        """,
-        (course_id,),
-        fetch_all=True,
-    )
-
-    # Process task completion data
-    for completion in task_completions:
-        user_id = completion[0]
-        result[user_id][course_id]["has_attempted"] = True
-
-    chat_messages = await execute_db_operation(
-        f"""
-        SELECT DISTINCT ch.user_id
+        WHERE tc.user_id IN ({cohort_learner_id_placeholders}) AND ct.course_id = ?
+        UNION
+        SELECT ch.user_id
         FROM {chat_history_table_name} ch
         JOIN {questions_table_name} q ON ch.question_id = q.id
         JOIN {tasks_table_name} t ON q.task_id = t.id
         JOIN {course_tasks_table_name} ct ON t.id = ct.task_id
-        WHERE ch.user_id IN ({cohort_learner_ids_str}) AND ct.course_id = ?
-        GROUP BY ch.user_id
+        WHERE ch.user_id IN ({cohort_learner_id_placeholders}) AND ct.course_id = ?
         """,
-        (course_id,),
+        (*cohort_learner_ids, course_id, *cohort_learner_ids, course_id),
         fetch_all=True,
     )
 
-    # Process chat message data
-    for message_data in chat_messages:
-        user_id = message_data[0]
-        result[user_id][course_id]["has_attempted"] = True
+    attempted_user_ids = {row[0] for row in attempted_users}
 
-    # Convert defaultdict to regular dict for cleaner response
-    return {user_id: dict(courses) for user_id, courses in result.items()}
+    return {
+        user_id: {course_id: {"has_attempted": user_id in attempted_user_ids}}
+        for user_id in cohort_learner_ids
+    }
 
 
 @cached(ttl=30, cache=SimpleMemoryCache)
@@ -298,85 +254,83 @@ async def get_cohort_streaks(
         date_filter = "AND strftime('%Y-%m', datetime(timestamp, '+5 hours', '+30 minutes')) = strftime('%Y-%m', 'now')"
 
     if batch_id is not None:
-        user_filter_subquery = f"""
-            SELECT uc.user_id
-            FROM {user_cohorts_table_name} uc
-            JOIN {user_batches_table_name} ub ON uc.user_id = ub.user_id
-            WHERE uc.cohort_id = ? AND ub.batch_id = ? AND uc.role = 'learner'
-        """
+        batch_join = f"JOIN {user_batches_table_name} ub ON uc.user_id = ub.user_id"
+        batch_filter = "AND ub.batch_id = ?"
         params = (cohort_id, cohort_id, cohort_id, batch_id)
     else:
-        user_filter_subquery = f"SELECT user_id FROM {user_cohorts_table_name} WHERE cohort_id = ? and role = 'learner'"
+        batch_join = ""
+        batch_filter = ""
         params = (cohort_id, cohort_id, cohort_id)
 
-    usage_per_user = await execute_db_operation(
+    # Collapse each user's activity to distinct IST dates and split them into
+    # runs of consecutive days (gaps-and-islands), so that only the length of
+    # the run ending today or yesterday (the current streak) leaves the database
+    streaks_per_user = await execute_db_operation(
         f"""
-    SELECT 
-        u.id,
-        u.email,
-        u.first_name,
-        u.middle_name,
-        u.last_name,
-        GROUP_CONCAT(t.created_at) as created_ats
-    FROM {users_table_name} u
-    LEFT JOIN (
+    WITH activity_dates AS (
         -- Chat history interactions
-        SELECT user_id, MAX(datetime(created_at, '+5 hours', '+30 minutes')) as created_at
+        SELECT user_id, DATE(datetime(created_at, '+5 hours', '+30 minutes')) as activity_date
         FROM {chat_history_table_name}
         WHERE 1=1 {date_filter} AND question_id IN (SELECT id FROM {questions_table_name} WHERE task_id IN (SELECT task_id FROM {course_tasks_table_name} WHERE course_id IN (SELECT course_id FROM {course_cohorts_table_name} WHERE cohort_id = ?)))
-        GROUP BY user_id, DATE(datetime(created_at, '+5 hours', '+30 minutes'))
-        
+
         UNION
-        
+
         -- Task completions
-        SELECT user_id, MAX(datetime(created_at, '+5 hours', '+30 minutes')) as created_at
+        SELECT user_id, DATE(datetime(created_at, '+5 hours', '+30 minutes')) as activity_date
         FROM {task_completions_table_name}
         WHERE 1=1 {date_filter} AND task_id IN (
             SELECT task_id FROM {course_tasks_table_name} 
             WHERE course_id IN (SELECT course_id FROM {course_cohorts_table_name} WHERE cohort_id = ?)
         )
-        GROUP BY user_id, DATE(datetime(created_at, '+5 hours', '+30 minutes'))
-        
-        ORDER BY created_at DESC, user_id
-    ) t ON u.id = t.user_id
-    WHERE u.id IN (
-        {user_filter_subquery}
+    ),
+    activity_runs AS (
+        SELECT
+            user_id,
+            activity_date,
+            julianday(activity_date) - ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY activity_date) as run_id
+        FROM activity_dates
+    ),
+    current_streaks AS (
+        SELECT user_id, COUNT(*) as streak_count
+        FROM activity_runs
+        GROUP BY user_id, run_id
+        HAVING MAX(activity_date) >= DATE('now', '+5 hours', '+30 minutes', '-1 day')
     )
-    GROUP BY u.id, u.email, u.first_name, u.middle_name, u.last_name
+    SELECT 
+        u.id,
+        u.email,
+        u.first_name,
+        u.middle_name,
+        u.last_name,
+        COALESCE(s.streak_count, 0) as streak_count
+    FROM {users_table_name} u
+    JOIN {user_cohorts_table_name} uc ON u.id = uc.user_id
+    {batch_join}
+    LEFT JOIN current_streaks s ON u.id = s.user_id
+    WHERE uc.cohort_id = ? AND uc.role = 'learner' {batch_filter}
+    ORDER BY u.id
     """,
         params,
         fetch_all=True,
     )
 
-    streaks = []
-
-    for (
-        user_id,
-        user_email,
-        user_first_name,
-        user_middle_name,
-        user_last_name,
-        user_usage_dates_str,
-    ) in usage_per_user:
-
-        if user_usage_dates_str:
-            user_usage_dates = user_usage_dates_str.split(",")
-            user_usage_dates = sorted(user_usage_dates, reverse=True)
-            streak_count = len(get_user_streak_from_usage_dates(user_usage_dates))
-        else:
-            streak_count = 0
-
-        streaks.append(
-            {
-                "user": {
-                    "id": user_id,
-                    "email": user_email,
-                    "first_name": user_first_name,
-                    "middle_name": user_middle_name,
-                    "last_name": user_last_name,
-                },
-                "streak_count": streak_count,
-            }
-        )
-
-    return streaks
+    return [
+        {
+            "user": {
+                "id": user_id,
+                "email": user_email,
+                "first_name": user_first_name,
+                "middle_name": user_middle_name,
+                "last_name": user_last_name,
+            },
+            "streak_count": streak_count,
+        }
+        for (
+            user_id,
+            user_email,
+            user_first_name,
+            user_middle_name,
+            user_last_name,
+            streak_count,
+        ) in streaks_per_user
+    ]
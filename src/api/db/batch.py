@@ -1,4 +1,6 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+import orjson
+from aiocache import SimpleMemoryCache
 from api.config import (
     batches_table_name,
     user_batches_table_name,
@@ -14,6 +16,11 @@ from api.utils.db import (
 )
 from api.db.user import insert_or_return_user
 
+# The (id, name, cohort_id) row of live batches keyed by batch id, read on
+# most batch requests. Entries are dropped when a batch is renamed or deleted.
+batch_cache = SimpleMemoryCache()
+BATCH_CACHE_TTL = 60
+
 
 async def create_batch(name: str, cohort_id: int) -> int:
     """Create a new batch and return its ID"""
@@ -74,69 +81,80 @@ async def delete_batch(batch_id: int):
         ]
     )
 
+    await batch_cache.delete(batch_id)
+
 
 async def get_batches_for_user_in_cohort(user_id: int, cohort_id: int) -> List[Dict]:
     """
     Get all batches for a user that shares the same organization as the specified cohort.
     Returns batch name, batch id, and user's role in each batch.
     """
-    # check if the cohort exists
-    cohort = await execute_db_operation(
+    # Check that the cohort exists and that the user is in it alongside
+    # fetching the user's batches; the outer LEFT JOIN always yields one
+    # row carrying both checks, even when the user has no batches
+    rows = await execute_db_operation(
         f"""
-        SELECT 1 FROM {cohorts_table_name} WHERE id = ? AND deleted_at IS NULL
+        WITH user_cohort_batches AS (
+            SELECT b.id, b.name, uc.role, b.created_at
+            FROM {batches_table_name} b
+            JOIN {user_batches_table_name} ub ON b.id = ub.batch_id
+            JOIN {user_cohorts_table_name} uc ON uc.user_id = ub.user_id AND uc.cohort_id = b.cohort_id
+            WHERE ub.user_id = ? AND b.cohort_id = ? AND b.deleted_at IS NULL AND ub.deleted_at IS NULL AND uc.deleted_at IS NULL
+        )
+        SELECT
+            EXISTS (SELECT 1 FROM {cohorts_table_name} WHERE id = ? AND deleted_at IS NULL),
+            EXISTS (
+                SELECT 1 FROM {user_cohorts_table_name} 
+                WHERE user_id = ? AND cohort_id = ? AND deleted_at IS NULL
+            ),
+            ucb.id, ucb.name, ucb.role
+        FROM (SELECT 1) LEFT JOIN user_cohort_batches ucb ON TRUE
+        ORDER BY ucb.created_at DESC
         """,
-        (cohort_id,),
-        fetch_one=True,
+        (user_id, cohort_id, cohort_id, user_id, cohort_id),
+        fetch_all=True,
     )
 
-    if not cohort:
-        raise Exception("Cohort not found")
+    cohort_exists, user_in_cohort = rows[0][:2]
 
-    # First verify the user is in the specified cohort
-    user_in_cohort = await execute_db_operation(
-        f"""
-        SELECT 1 FROM {user_cohorts_table_name} 
-        WHERE user_id = ? AND cohort_id = ? AND deleted_at IS NULL
-        """,
-        (user_id, cohort_id),
-        fetch_one=True,
-    )
+    if not cohort_exists:
+        raise Exception("Cohort not found")
 
     if not user_in_cohort:
         raise Exception("User is not a member of the specified cohort")
 
-    # Get all batches in the same organization where the user is a member
-    results = await execute_db_operation(
-        f"""
-        SELECT b.id, b.name, uc.role
-        FROM {batches_table_name} b
-        JOIN {user_batches_table_name} ub ON b.id = ub.batch_id
-        JOIN {user_cohorts_table_name} uc ON uc.user_id = ub.user_id AND uc.cohort_id = b.cohort_id
-        WHERE ub.user_id = ? AND b.cohort_id = ? AND b.deleted_at IS NULL AND ub.deleted_at IS NULL AND uc.deleted_at IS NULL
-        ORDER BY b.created_at DESC
-        """,
-        (user_id, cohort_id),
-        fetch_all=True,
-    )
-
     return [
         {
             "id": batch_id,
             "name": batch_name,
             "role": role,
         }
-        for batch_id, batch_name, role in results
+        for _, _, batch_id, batch_name, role in rows
+        if batch_id is not None
     ]
 
 
+async def _get_batch_row(batch_id: int) -> Optional[Tuple]:
+    batch = await batch_cache.get(batch_id)
+
+    if batch is None:
+        batch = await execute_db_operation(
+            f"""SELECT id, name, cohort_id FROM {batches_table_name} WHERE id = ? AND deleted_at IS NULL""",
+            (batch_id,),
+            fetch_one=True,
+        )
+
+        # missing batches are not cached so that newly created ones show up
+        if batch:
+            await batch_cache.set(batch_id, tuple(batch), ttl=BATCH_CACHE_TTL)
+
+    return batch
+
+
 async def get_batch_by_id(batch_id: int) -> Dict:
     """Get batch details including all members"""
     # Fetch batch details
-    batch = await execute_db_operation(
-        f"""SELECT id, name, cohort_id FROM {batches_table_name} WHERE id = ? AND deleted_at IS NULL""",
-        (batch_id,),
-        fetch_one=True,
-    )
+    batch = await _get_batch_row(batch_id)
 
     if not batch:
         return None
@@ -170,42 +188,36 @@ async def get_batch_by_id(batch_id: int) -> Dict:
 
 async def get_all_batches_for_cohort(cohort_id: int) -> List[Dict]:
     """Get all batches for a cohort with their members"""
-    # Get all batches and their members in a single query
+    # Get all batches in a single query with their members aggregated
+    # into a JSON array per batch, so each batch comes back as one row
     results = await execute_db_operation(
         f"""
         SELECT 
             b.id as batch_id, 
             b.name as batch_name,
-            u.id as user_id,
-            u.email as user_email,
-            uc.role as user_role
+            (
+                SELECT json_group_array(json_object('id', m.user_id, 'email', m.user_email, 'role', m.user_role))
+                FROM (
+                    SELECT u.id as user_id, u.email as user_email, uc.role as user_role
+                    FROM {user_batches_table_name} ub
+                    JOIN {users_table_name} u ON ub.user_id = u.id
+                    LEFT JOIN {user_cohorts_table_name} uc ON uc.user_id = ub.user_id AND uc.cohort_id = b.cohort_id AND uc.deleted_at IS NULL
+                    WHERE ub.batch_id = b.id AND ub.deleted_at IS NULL
+                    ORDER BY uc.role
+                ) m
+            ) as members
         FROM {batches_table_name} b
-        LEFT JOIN {user_batches_table_name} ub ON b.id = ub.batch_id AND ub.deleted_at IS NULL
-        LEFT JOIN {users_table_name} u ON ub.user_id = u.id
-        LEFT JOIN {user_cohorts_table_name} uc ON uc.user_id = ub.user_id AND uc.cohort_id = b.cohort_id AND uc.deleted_at IS NULL
         WHERE b.cohort_id = ? AND b.deleted_at IS NULL
-        ORDER BY b.id DESC, uc.role
+        ORDER BY b.id DESC
         """,
         (cohort_id,),
         fetch_all=True,
     )
 
-    # Group results by batch
-    batches_dict = {}
-    for row in results:
-        batch_id, batch_name, user_id, user_email, user_role = row
-
-        if batch_id not in batches_dict:
-            batches_dict[batch_id] = {"id": batch_id, "name": batch_name, "members": []}
-
-        # Add member if user data exists (LEFT JOIN might return NULL for batches without members)
-        if user_id is not None:
-            batches_dict[batch_id]["members"].append(
-                {"id": user_id, "email": user_email, "role": user_role}
-            )
-
-    # Convert to list maintaining the order (ORDER BY b.id DESC)
-    return list(batches_dict.values())
+    return [
+        {"id": batch_id, "name": batch_name, "members": orjson.loads(members)}
+        for batch_id, batch_name, members in results
+    ]
 
 
 async def update_batch_name_and_members(
@@ -222,44 +234,40 @@ async def update_batch_name_and_members(
             f"UPDATE {batches_table_name} SET name = ? WHERE id = ? AND deleted_at IS NULL",
             (name, batch_id),
         )
-        # Add new members
+        # Add new members, reviving soft-deleted memberships; rows for users
+        # already active in the batch are left untouched and not counted
         if members_added:
-            # Check for existing users
-            q = f"SELECT user_id FROM {user_batches_table_name} WHERE batch_id = ? AND user_id IN ({','.join(['?' for _ in members_added])}) AND deleted_at IS NULL"
-            await cursor.execute(q, (batch_id, *members_added))
-            existing_active = await cursor.fetchall()
-            if existing_active:
+            values = [(user_id, batch_id) for user_id in members_added]
+            await cursor.executemany(
+                f"""
+                INSERT INTO {user_batches_table_name} (user_id, batch_id)
+                VALUES (?, ?)
+                ON CONFLICT(user_id, batch_id) DO UPDATE SET
+                    deleted_at = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE deleted_at IS NOT NULL
+                """,
+                values,
+            )
+
+            if cursor.rowcount != len(set(members_added)):
                 raise Exception("One or more users are already in the batch")
 
-            if members_added:
-                values = [(user_id, batch_id) for user_id in members_added]
-                await cursor.executemany(
-                    f"""
-                    INSERT INTO {user_batches_table_name} (user_id, batch_id)
-                    VALUES (?, ?)
-                    ON CONFLICT(user_id, batch_id) DO UPDATE SET
-                        deleted_at = NULL,
-                        updated_at = CURRENT_TIMESTAMP
-                    """,
-                    values,
-                )
-
-        # Remove members
+        # Remove members; the ids are bound as one JSON array so the statement
+        # text stays the same whatever the number of members
         if members_removed:
-            q = f"SELECT user_id FROM {user_batches_table_name} WHERE batch_id = ? AND user_id IN ({','.join(['?' for _ in members_removed])}) AND deleted_at IS NULL"
-            await cursor.execute(q, (batch_id, *members_removed))
-            found = await cursor.fetchall()
-
-            if len(found) != len(members_removed):
-                raise Exception("One or more members are not in the batch")
-
             await cursor.execute(
-                f"UPDATE {user_batches_table_name} SET deleted_at = CURRENT_TIMESTAMP WHERE batch_id = ? AND user_id IN ({','.join(['?' for _ in members_removed])}) AND deleted_at IS NULL",
-                (batch_id, *members_removed),
+                f"UPDATE {user_batches_table_name} SET deleted_at = CURRENT_TIMESTAMP WHERE batch_id = ? AND user_id IN (SELECT value FROM json_each(?)) AND deleted_at IS NULL",
+                (batch_id, orjson.dumps(members_removed).decode()),
             )
 
+            if cursor.rowcount != len(members_removed):
+                raise Exception("One or more members are not in the batch")
+
         await conn.commit()
 
+    await batch_cache.delete(batch_id)
+
     return await get_batch_by_id(batch_id)
 
 
@@ -274,13 +282,6 @@ async def validate_batch_belongs_to_cohort(batch_id: int, cohort_id: int) -> boo
     Returns:
         bool: True if the batch belongs to the cohort, False otherwise
     """
-    result = await execute_db_operation(
-        f"""
-        SELECT 1 FROM {batches_table_name} 
-        WHERE id = ? AND cohort_id = ? AND deleted_at IS NULL
-        """,
-        (batch_id, cohort_id),
-        fetch_one=True,
-    )
+    batch = await _get_batch_row(batch_id)
 
-    return result is not None
+    return batch is not None and batch[2] == cohort_id
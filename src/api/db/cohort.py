@@ -22,6 +22,7 @@ from api.utils.db import (
     get_new_db_connection,
 )
 from api.db.user import insert_or_return_user
+from api.db.batch import batch_cache
 from api.db.course import get_course
 from api.slack import send_slack_notification_for_member_added_to_cohort
 
@@ -155,6 +156,15 @@ async def delete_cohort(cohort_id: int):
         ]
     )
 
+    # the cohort's batches were deleted along with it, so evict their cached rows
+    batches = await execute_db_operation(
+        f"SELECT id FROM {batches_table_name} WHERE cohort_id = ?",
+        (cohort_id,),
+        fetch_all=True,
+    )
+    for (batch_id,) in batches:
+        await batch_cache.delete(batch_id)
+
 
 def drop_cohorts_table():
     execute_db_operation(f"DROP TABLE IF EXISTS {cohorts_table_name}")
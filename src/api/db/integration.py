@@ -16,6 +16,7 @@ async def create_integration(data: CreateIntegrationRequest) -> int:
                 refresh_token = excluded.refresh_token,
                 expires_at = excluded.expires_at,
                 deleted_at = NULL
+            RETURNING id
             """,
             (
                 data.user_id,
@@ -25,15 +26,11 @@ async def create_integration(data: CreateIntegrationRequest) -> int:
                 data.expires_at,
             ),
         )
+        # the ID of the upserted record, whether inserted or updated
+        result = await cursor.fetchone()
         await conn.commit()
 
-        # Get the ID of the upserted record
-        await cursor.execute(
-            f"SELECT id FROM {integrations_table_name} WHERE user_id = ? AND integration_type = ?",
-            (data.user_id, data.integration_type),
-        )
-        result = await cursor.fetchone()
-        return result[0] if result else cursor.lastrowid
+        return result[0]
 
 
 async def get_integration(integration_id: int) -> Optional[Integration]:
@@ -1,5 +1,3 @@
-import json
-
 from api.models import TaskStatus, TaskType, QuestionType, TaskAIResponseType
 from api.utils.db import get_new_db_connection
 from api.config import (
@@ -41,19 +39,12 @@ async def add_missing_timestamp_columns():
         ]
 
         for table_name, columns_to_add in tables_to_update:
-            # Check if table exists
-            await cursor.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-                (table_name,),
-            )
-            table_exists = await cursor.fetchone()
-
-            if not table_exists:
-                continue
-
-            # Get existing columns
+            # Get existing columns; a table that doesn't exist has none
             await cursor.execute(f"PRAGMA table_info({table_name})")
-            existing_columns = [col[1] for col in await cursor.fetchall()]
+            existing_columns = {col[1] for col in await cursor.fetchall()}
+
+            if not existing_columns:
+                continue
 
             # Add missing columns first (without setting values)
             columns_added = []
@@ -63,15 +54,13 @@ async def add_missing_timestamp_columns():
                         f"ALTER TABLE {table_name} ADD COLUMN {column} DATETIME"
                     )
                     columns_added.append(column)
+                    existing_columns.add(column)
 
             # Now update the timestamp columns with appropriate values
             # Handle created_at first
             if "created_at" in columns_added:
                 # Check if updated_at column already exists in the table
-                await cursor.execute(f"PRAGMA table_info({table_name})")
-                current_columns = [col[1] for col in await cursor.fetchall()]
-
-                if "updated_at" in current_columns:
+                if "updated_at" in existing_columns:
                     # Set created_at to existing updated_at if updated_at exists
                     await cursor.execute(
                         f"UPDATE {table_name} SET created_at = updated_at WHERE created_at IS NULL AND updated_at IS NOT NULL"
@@ -89,10 +78,7 @@ async def add_missing_timestamp_columns():
             # Handle updated_at second (after created_at is set)
             if "updated_at" in columns_added:
                 # Check if created_at column exists in the table
-                await cursor.execute(f"PRAGMA table_info({table_name})")
-                current_columns = [col[1] for col in await cursor.fetchall()]
-
-                if "created_at" in current_columns:
+                if "created_at" in existing_columns:
                     # Set updated_at to created_at if created_at exists
                     await cursor.execute(
                         f"UPDATE {table_name} SET updated_at = created_at WHERE updated_at IS NULL"
@@ -148,6 +134,7 @@ async def add_missing_timestamp_columns():
                     CREATE TRIGGER {update_trigger_name}
                     AFTER UPDATE ON {table_name}
                     FOR EACH ROW
+                    WHEN NEW.updated_at IS OLD.updated_at
                     BEGIN
                         UPDATE {table_name} 
                         SET updated_at = CURRENT_TIMESTAMP 
@@ -172,6 +159,24 @@ async def create_bq_sync_table_migration():
         await conn.commit()
 
 
+async def create_activity_date_indexes_migration():
+    """
+    Migration: Creates the covering indexes used by the cohort streak query if they don't exist.
+    """
+    async with get_new_db_connection() as conn:
+        cursor = await conn.cursor()
+
+        await cursor.execute(
+            f"""CREATE INDEX IF NOT EXISTS idx_chat_history_question_user_created_at ON {chat_history_table_name} (question_id, user_id, created_at)"""
+        )
+
+        await cursor.execute(
+            f"""CREATE INDEX IF NOT EXISTS idx_task_completion_task_user_created_at ON {task_completions_table_name} (task_id, user_id, created_at)"""
+        )
+
+        await conn.commit()
+
+
 async def cleanup_invalid_chat_history():
     """
     Migration: Cleanup chat history records with empty or invalid AI responses for assignments.
@@ -181,55 +186,46 @@ async def cleanup_invalid_chat_history():
     async with get_new_db_connection() as conn:
         cursor = await conn.cursor()
 
-        # Get all assistant messages for assignments only (task_id IS NOT NULL)
+        # Soft delete assistant messages for assignments only (task_id IS NOT NULL)
+        # whose JSON object content has a falsy feedback (missing, null, false, 0,
+        # "", [] or {}) or a feedback string that is blank once every character
+        # Python's str.strip() removes is trimmed; rows whose content is not a
+        # JSON object are left alone
         await cursor.execute(
             f"""
-            SELECT id, content
-            FROM {chat_history_table_name}
+            UPDATE {chat_history_table_name}
+            SET deleted_at = CURRENT_TIMESTAMP
             WHERE role = 'assistant'
             AND task_id IS NOT NULL
             AND deleted_at IS NULL
+            AND json_valid(content)
+            AND json_type(content) = 'object'
+            AND CASE json_type(content, '$.feedback')
+                WHEN 'true' THEN 0
+                WHEN 'integer' THEN json_extract(content, '$.feedback') = 0
+                WHEN 'real' THEN json_extract(content, '$.feedback') = 0
+                WHEN 'array' THEN json_array_length(content, '$.feedback') = 0
+                WHEN 'object' THEN json_extract(content, '$.feedback') = '{{}}'
+                WHEN 'text' THEN TRIM(
+                    json_extract(content, '$.feedback'),
+                    char(
+                        9, 10, 11, 12, 13, 28, 29, 30, 31, 32, 133, 160, 5760,
+                        8192, 8193, 8194, 8195, 8196, 8197, 8198, 8199, 8200,
+                        8201, 8202, 8232, 8233, 8239, 8287, 12288
+                    )
+                ) = ''
+                -- missing, null or false
+                ELSE 1
+            END
             """
         )
 
-        messages = await cursor.fetchall()
-        invalid_message_ids = []
-
-        for message_id, content in messages:
-            try:
-                # Try to parse the content as JSON
-                if content:
-                    content_obj = json.loads(content)
-
-                    # Check if feedback is empty or contains only whitespace
-                    feedback = content_obj.get("feedback", "")
-
-                    # Check if this is an invalid response
-                    # Invalid if feedback is empty
-                    is_invalid = not feedback or not feedback.strip()
-
-                    if is_invalid:
-                        invalid_message_ids.append(message_id)
-            except (json.JSONDecodeError, AttributeError, TypeError):
-                # Skip if content is not valid JSON
-                continue
-
-        # Soft delete invalid messages
-        if invalid_message_ids:
-            placeholders = ','.join('?' * len(invalid_message_ids))
-            await cursor.execute(
-                f"""
-                UPDATE {chat_history_table_name}
-                SET deleted_at = CURRENT_TIMESTAMP
-                WHERE id IN ({placeholders}) AND deleted_at IS NULL
-                """,
-                invalid_message_ids
-            )
-
-            print(f"Cleaned up {len(invalid_message_ids)} invalid chat history records")
+        if cursor.rowcount > 0:
+            print(f"Cleaned up {cursor.rowcount} invalid chat history records")
 
         await conn.commit()
 
 
 async def run_migrations():
     await cleanup_invalid_chat_history()
+    await create_activity_date_indexes_migration()
@@ -34,6 +34,7 @@ from api.routes import (
 # )
 from api.websockets import router as websocket_router
 from api.scheduler import scheduler
+from api.utils.db import close_db_connections
 from api.settings import settings
 import sentry_sdk
 
@@ -56,6 +57,7 @@ async def lifespan(app: FastAPI):
 
     logger.info("Shutting down application")
     scheduler.shutdown()
+    await close_db_connections()
 
 
 if settings.sentry_dsn:
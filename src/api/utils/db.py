@@ -11,21 +11,61 @@ def trace_callback(sql):
     db_logger.info(f"Executing operation: {sql}")
 
 
-@asynccontextmanager
-async def get_new_db_connection():
-    conn = None
+# Maximum number of idle connections kept open for reuse
+DB_POOL_SIZE = 8
+
+_idle_connections: List[aiosqlite.Connection] = []
+
+
+async def _open_db_connection() -> aiosqlite.Connection:
+    pending_conn = aiosqlite.connect(sqlite_db_path)
+    # idle pooled connections must not keep the process alive on exit
+    pending_conn.daemon = True
+    conn = await pending_conn
     try:
-        conn = await aiosqlite.connect(sqlite_db_path)
+        # set_db_defaults only runs when the database file is first created;
+        # make sure older databases are in WAL mode too so readers don't block the writer
+        await conn.execute("PRAGMA journal_mode=WAL;")
         await conn.execute("PRAGMA synchronous=NORMAL;")
         await conn.set_trace_callback(trace_callback)
+    except Exception:
+        await conn.rollback()
+        await conn.close()
+        raise
+
+    return conn
+
+
+async def _release_db_connection(conn: aiosqlite.Connection):
+    if conn.in_transaction:
+        # discard anything the caller did not commit, as closing would have
+        await conn.rollback()
+
+    if len(_idle_connections) < DB_POOL_SIZE:
+        _idle_connections.append(conn)
+    else:
+        await conn.close()
+
+
+async def close_db_connections():
+    while _idle_connections:
+        await _idle_connections.pop().close()
+
+
+@asynccontextmanager
+async def get_new_db_connection():
+    conn = _idle_connections.pop() if _idle_connections else await _open_db_connection()
+    try:
         yield conn
-    except Exception as e:
-        if conn:
+    except BaseException:
+        # a connection that saw an error is not handed back to the pool
+        try:
             await conn.rollback()  # Rollback on any exception
-        raise  # Re-raise the exception to propagate the error
-    finally:
-        if conn:
+        finally:
             await conn.close()
+        raise  # Re-raise the exception to propagate the error
+
+    await _release_db_connection(conn)
 
 
 def set_db_defaults():
@@ -89,6 +129,10 @@ async def execute_multiple_db_operations(commands_and_params: List[Tuple[str, Tu
     async with get_new_db_connection() as conn:
         cursor = await conn.cursor()
 
+        # Take the write lock up front so a transaction that starts with a
+        # read cannot fail to upgrade once another connection has written
+        await cursor.execute("BEGIN IMMEDIATE")
+
         for command, params in commands_and_params:
             await cursor.execute(command, params)
 
@@ -208,6 +208,8 @@ class TestChatBQ:
         mock_client_instance = MagicMock()
         mock_bigquery.Client.return_value = mock_client_instance
 
+        get_bq_client.cache_clear()
+
         with patch.dict(os.environ, {}, clear=True):
             client = get_bq_client()
 
@@ -218,3 +220,9 @@ class TestChatBQ:
             )
             assert client == mock_client_instance
             mock_bigquery.Client.assert_called_once()
+
+            # Subsequent calls reuse the same client
+            assert get_bq_client() is client
+            mock_bigquery.Client.assert_called_once()
+
+        get_bq_client.cache_clear()
@@ -4,6 +4,7 @@ from unittest.mock import patch, MagicMock, AsyncMock
 from src.api.bq.task import (
     get_bq_client,
     get_scorecard,
+    get_scorecards,
     convert_question_bq_to_dict,
     get_basic_task_details,
     get_task,
@@ -105,6 +106,64 @@ class TestTaskBQ:
 
         assert result["criteria"] == []
 
+    @pytest.mark.asyncio
+    async def test_get_scorecards_empty_input(self):
+        """Test get_scorecards with no scorecard ids."""
+        result = await get_scorecards([])
+        assert result == {}
+
+    @patch("src.api.bq.task.get_bq_client")
+    @patch("src.api.bq.task.settings")
+    @pytest.mark.asyncio
+    async def test_get_scorecards_success(self, mock_settings, mock_get_client):
+        """Test fetching multiple scorecards in a single query."""
+        mock_settings.bq_project_name = "test_project"
+        mock_settings.bq_dataset_name = "test_dataset"
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        mock_query_job = MagicMock()
+        mock_client.query.return_value = mock_query_job
+        mock_query_job.result.return_value = [
+            {
+                "id": 1,
+                "title": "Scorecard 1",
+                "criteria": '[{"name": "Accuracy"}]',
+                "status": "published",
+            },
+            {
+                "id": 2,
+                "title": "Scorecard 2",
+                "criteria": None,
+                "status": "draft",
+            },
+        ]
+
+        result = await get_scorecards([1, 2])
+
+        assert result == {
+            1: {
+                "id": 1,
+                "title": "Scorecard 1",
+                "criteria": [{"name": "Accuracy"}],
+                "status": "published",
+            },
+            2: {
+                "id": 2,
+                "title": "Scorecard 2",
+                "criteria": [],
+                "status": "draft",
+            },
+        }
+
+        mock_client.query.assert_called_once()
+        call_args = mock_client.query.call_args
+        assert "IN UNNEST(@scorecard_ids)" in call_args[0][0]
+        job_config = call_args[1]["job_config"]
+        assert job_config.query_parameters[0].name == "scorecard_ids"
+        assert job_config.query_parameters[0].values == [1, 2]
+
     def test_convert_question_bq_to_dict_full_data(self):
         """Test convert_question_bq_to_dict with full data."""
         question = {
@@ -196,6 +255,9 @@ class TestTaskBQ:
         assert result["org_id"] == 123
         assert result["scheduled_publish_at"] == "2024-01-01 12:00:00"
 
+        # Only the first row of the point lookup is requested
+        mock_query_job.result.assert_called_once_with(max_results=1)
+
     @patch("src.api.bq.task.get_bq_client")
     @patch("src.api.bq.task.settings")
     @pytest.mark.asyncio
@@ -217,34 +279,30 @@ class TestTaskBQ:
 
         assert result is None
 
-    @patch("src.api.bq.task.get_basic_task_details")
+    @patch("src.api.bq.task.get_bq_client")
+    @patch("src.api.bq.task.settings")
     @pytest.mark.asyncio
-    async def test_get_task_not_found(self, mock_get_basic):
+    async def test_get_task_not_found(self, mock_settings, mock_get_client):
         """Test get_task when task not found."""
-        mock_get_basic.return_value = None
+        mock_settings.bq_project_name = "test_project"
+        mock_settings.bq_dataset_name = "test_dataset"
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.query.return_value.result.return_value = []
 
         result = await get_task(1)
 
         assert result is None
+        mock_client.query.assert_called_once()
 
-    @patch("src.api.bq.task.get_basic_task_details")
     @patch("src.api.bq.task.get_bq_client")
     @patch("src.api.bq.task.settings")
     @pytest.mark.asyncio
     async def test_get_task_learning_material_success(
-        self, mock_settings, mock_get_client, mock_get_basic
+        self, mock_settings, mock_get_client
     ):
         """Test get_task for learning material task type with blocks."""
-        # Mock basic task details
-        mock_get_basic.return_value = {
-            "id": 1,
-            "title": "Learning Material Task",
-            "type": "learning_material",  # Use string value instead of enum
-            "status": "published",
-            "org_id": 123,
-            "scheduled_publish_at": "2024-01-01 12:00:00",
-        }
-
         # Mock BigQuery client
         mock_settings.bq_project_name = "test_project"
         mock_settings.bq_dataset_name = "test_dataset"
@@ -255,7 +313,17 @@ class TestTaskBQ:
         mock_query_job = MagicMock()
         mock_client.query.return_value = mock_query_job
 
-        mock_rows = [{"blocks": '["block1", "block2", "block3"]'}]
+        mock_rows = [
+            {
+                "id": 1,
+                "title": "Learning Material Task",
+                "type": "learning_material",  # Use string value instead of enum
+                "status": "published",
+                "org_id": 123,
+                "scheduled_publish_at": "2024-01-01 12:00:00",
+                "blocks": '["block1", "block2", "block3"]',
+            }
+        ]
         mock_query_job.result.return_value = mock_rows
 
         result = await get_task(1)
@@ -263,33 +331,24 @@ class TestTaskBQ:
         assert result["id"] == 1
         assert result["title"] == "Learning Material Task"
         assert result["type"] == "learning_material"
+        assert result["org_id"] == 123
         assert result["blocks"] == ["block1", "block2", "block3"]
 
-        # Verify query was called correctly
+        # Verify the task details and blocks were fetched in a single query
         mock_client.query.assert_called_once()
         call_args = mock_client.query.call_args
         query = call_args[0][0]
-        assert "SELECT blocks" in query
+        assert "scheduled_publish_at, blocks" in query
+        assert "deleted_at IS NULL" in query
         assert "test_project.test_dataset" in query
 
-    @patch("src.api.bq.task.get_basic_task_details")
     @patch("src.api.bq.task.get_bq_client")
     @patch("src.api.bq.task.settings")
     @pytest.mark.asyncio
     async def test_get_task_learning_material_null_blocks(
-        self, mock_settings, mock_get_client, mock_get_basic
+        self, mock_settings, mock_get_client
     ):
         """Test get_task for learning material task type with null blocks."""
-        # Mock basic task details
-        mock_get_basic.return_value = {
-            "id": 1,
-            "title": "Learning Material Task",
-            "type": "learning_material",  # Use string value instead of enum
-            "status": "published",
-            "org_id": 123,
-            "scheduled_publish_at": "2024-01-01 12:00:00",
-        }
-
         # Mock BigQuery client
         mock_settings.bq_project_name = "test_project"
         mock_settings.bq_dataset_name = "test_dataset"
@@ -300,7 +359,17 @@ class TestTaskBQ:
         mock_query_job = MagicMock()
         mock_client.query.return_value = mock_query_job
 
-        mock_rows = [{"blocks": None}]
+        mock_rows = [
+            {
+                "id": 1,
+                "title": "Learning Material Task",
+                "type": "learning_material",  # Use string value instead of enum
+                "status": "published",
+                "org_id": 123,
+                "scheduled_publish_at": "2024-01-01 12:00:00",
+                "blocks": None,
+            }
+        ]
         mock_query_job.result.return_value = mock_rows
 
         result = await get_task(1)
@@ -308,60 +377,26 @@ class TestTaskBQ:
         assert result["id"] == 1
         assert result["blocks"] == []
 
-    @patch("src.api.bq.task.get_basic_task_details")
-    @patch("src.api.bq.task.get_bq_client")
-    @patch("src.api.bq.task.settings")
-    @pytest.mark.asyncio
-    async def test_get_task_learning_material_no_rows(
-        self, mock_settings, mock_get_client, mock_get_basic
-    ):
-        """Test get_task for learning material task type with no rows returned."""
-        # Mock basic task details
-        mock_get_basic.return_value = {
-            "id": 1,
-            "title": "Learning Material Task",
-            "type": "learning_material",  # Use string value instead of enum
-            "status": "published",
-            "org_id": 123,
-            "scheduled_publish_at": "2024-01-01 12:00:00",
-        }
-
-        # Mock BigQuery client
-        mock_settings.bq_project_name = "test_project"
-        mock_settings.bq_dataset_name = "test_dataset"
-
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
-
-        mock_query_job = MagicMock()
-        mock_client.query.return_value = mock_query_job
-
-        # No rows returned
-        mock_query_job.result.return_value = []
-
-        result = await get_task(1)
-
-        assert result["id"] == 1
-        assert "blocks" not in result  # blocks key should not be added if no rows
-
-    @patch("src.api.bq.task.get_basic_task_details")
     @patch("src.api.bq.task.get_bq_client")
-    @patch("src.api.bq.task.get_scorecard")
+    @patch("src.api.bq.task.get_scorecards")
     @patch("src.api.bq.task.settings")
     @pytest.mark.asyncio
     async def test_get_task_quiz_with_questions_and_scorecards(
-        self, mock_settings, mock_get_scorecard, mock_get_client, mock_get_basic
+        self, mock_settings, mock_get_scorecards, mock_get_client
     ):
         """Test get_task for quiz task type with questions and scorecards."""
         # Mock basic task details
-        mock_get_basic.return_value = {
-            "id": 1,
-            "title": "Quiz Task",
-            "type": "quiz",  # Use string value instead of enum
-            "status": "published",
-            "org_id": 123,
-            "scheduled_publish_at": "2024-01-01 12:00:00",
-        }
+        mock_task_rows = [
+            {
+                "id": 1,
+                "title": "Quiz Task",
+                "type": "quiz",  # Use string value instead of enum
+                "status": "published",
+                "org_id": 123,
+                "scheduled_publish_at": "2024-01-01 12:00:00",
+                "blocks": None,
+            }
+        ]
 
         # Mock BigQuery client
         mock_settings.bq_project_name = "test_project"
@@ -370,9 +405,6 @@ class TestTaskBQ:
         mock_client = MagicMock()
         mock_get_client.return_value = mock_client
 
-        mock_query_job = MagicMock()
-        mock_client.query.return_value = mock_query_job
-
         mock_questions = [
             {
                 "id": 1,
@@ -403,7 +435,10 @@ class TestTaskBQ:
                 "title": "Question 2",
             },
         ]
-        mock_query_job.result.return_value = mock_questions
+        mock_client.query.side_effect = [
+            MagicMock(result=MagicMock(return_value=mock_task_rows)),
+            MagicMock(result=MagicMock(return_value=mock_questions)),
+        ]
 
         # Mock scorecard
         mock_scorecard = {
@@ -412,13 +447,14 @@ class TestTaskBQ:
             "criteria": {"max_score": 10},
             "status": "published",
         }
-        mock_get_scorecard.return_value = mock_scorecard
+        mock_get_scorecards.return_value = {10: mock_scorecard}
 
         result = await get_task(1)
 
         assert result["id"] == 1
         assert result["title"] == "Quiz Task"
         assert result["type"] == "quiz"
+        assert "blocks" not in result
         assert len(result["questions"]) == 2
 
         # Check first question with scorecard
@@ -439,26 +475,26 @@ class TestTaskBQ:
         assert q2["blocks"] == ["question2"]
         assert q2["answer"] is None
 
-        # Verify scorecard was only called once for the question that had scorecard_id
-        mock_get_scorecard.assert_called_once_with(10)
+        # Verify scorecards were fetched once for the questions that had scorecard_id
+        mock_get_scorecards.assert_called_once_with([10])
 
-    @patch("src.api.bq.task.get_basic_task_details")
     @patch("src.api.bq.task.get_bq_client")
     @patch("src.api.bq.task.settings")
     @pytest.mark.asyncio
-    async def test_get_task_quiz_no_questions(
-        self, mock_settings, mock_get_client, mock_get_basic
-    ):
+    async def test_get_task_quiz_no_questions(self, mock_settings, mock_get_client):
         """Test get_task for quiz task type with no questions."""
         # Mock basic task details
-        mock_get_basic.return_value = {
-            "id": 1,
-            "title": "Quiz Task",
-            "type": "quiz",  # Use string value instead of enum
-            "status": "published",
-            "org_id": 123,
-            "scheduled_publish_at": "2024-01-01 12:00:00",
-        }
+        mock_task_rows = [
+            {
+                "id": 1,
+                "title": "Quiz Task",
+                "type": "quiz",  # Use string value instead of enum
+                "status": "published",
+                "org_id": 123,
+                "scheduled_publish_at": "2024-01-01 12:00:00",
+                "blocks": None,
+            }
+        ]
 
         # Mock BigQuery client
         mock_settings.bq_project_name = "test_project"
@@ -467,11 +503,11 @@ class TestTaskBQ:
         mock_client = MagicMock()
         mock_get_client.return_value = mock_client
 
-        mock_query_job = MagicMock()
-        mock_client.query.return_value = mock_query_job
-
         # No questions returned
-        mock_query_job.result.return_value = []
+        mock_client.query.side_effect = [
+            MagicMock(result=MagicMock(return_value=mock_task_rows)),
+            MagicMock(result=MagicMock(return_value=[])),
+        ]
 
         result = await get_task(1)
 
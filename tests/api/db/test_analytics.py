@@ -15,6 +15,8 @@ async def clear_analytics_cache():
     """Clear cache after each test to prevent test interference."""
     yield
     # Clear caches for cached functions
+    if hasattr(get_usage_summary_by_organization, "cache"):
+        await get_usage_summary_by_organization.cache.clear()
     if hasattr(get_cohort_completion, "cache"):
         await get_cohort_completion.cache.clear()
     if hasattr(get_cohort_streaks, "cache"):
@@ -24,6 +26,22 @@ async def clear_analytics_cache():
 class TestGetUsageSummaryByOrganization:
     """Test suite for get_usage_summary_by_organization function."""
 
+    @pytest.mark.asyncio
+    @patch("api.db.analytics.execute_db_operation")
+    async def test_get_usage_summary_cached_per_period(self, mock_db):
+        """Test that repeat calls for the same period reuse the cached summary."""
+        mock_db.return_value = [(1, "Organization A", 150)]
+
+        first = await get_usage_summary_by_organization("current_year")
+        second = await get_usage_summary_by_organization("current_year")
+
+        assert first == second
+        mock_db.assert_called_once()
+
+        await get_usage_summary_by_organization("current_month")
+
+        assert mock_db.call_count == 2
+
     @pytest.mark.asyncio
     @patch("api.db.analytics.execute_db_operation")
     async def test_get_usage_summary_no_filter(self, mock_db):
@@ -129,14 +147,16 @@ class TestGetCohortCompletion:
         """Test basic cohort completion functionality."""
         # Mock database responses in order of calls
         mock_db.side_effect = [
-            # First call: completed tasks
-            [(1, 101), (2, 103)],
-            # Second call: completed questions
-            [(1, 201), (2, 202)],
-            # Third call: learning material tasks
-            [(101,), (103,)],
-            # Fourth call: quiz/exam questions
-            [(104, 301), (104, 302), (105, 303)],
+            # First call: completed tasks and questions
+            [(1, 101, None), (2, 103, None), (1, None, 201), (2, None, 202)],
+            # Second call: learning material tasks and quiz/exam questions
+            [
+                (101, "learning_material", None),
+                (103, "assignment", None),
+                (104, "quiz", 301),
+                (104, "quiz", 302),
+                (105, "quiz", 303),
+            ],
         ]
 
         result = await get_cohort_completion(
@@ -166,10 +186,9 @@ class TestGetCohortCompletion:
     async def test_get_cohort_completion_with_course_id(self, mock_db):
         """Test cohort completion with specific course ID."""
         mock_db.side_effect = [
-            [(1, 101)],  # completed tasks
-            [(1, 201)],  # completed questions
-            [(101,)],  # learning material tasks
-            [(102, 301)],  # quiz questions
+            [(1, 101, None), (1, None, 201)],  # completed tasks and questions
+            # learning material tasks and quiz questions
+            [(101, "learning_material", None), (102, "quiz", 301)],
         ]
 
         result = await get_cohort_completion(cohort_id=1, user_ids=[1], course_id=5)
@@ -180,23 +199,23 @@ class TestGetCohortCompletion:
         # Verify course_id parameter was passed to queries
         call_args_list = [call[0] for call in mock_db.call_args_list]
 
-        # Third call should include course_id filter
-        assert "AND ct.course_id = ?" in call_args_list[2][0]
-        assert call_args_list[2][1] == (1, 5)
+        # Completion query should bind the user ids instead of inlining them
+        assert "user_id in (?)" in call_args_list[0][0]
+        assert call_args_list[0][1] == (1,)
 
-        # Fourth call should include course_id filter
-        assert "AND ct.course_id = ?" in call_args_list[3][0]
-        assert call_args_list[3][1] == (1, 5)
+        # Tasks query should include course_id filter
+        assert len(call_args_list) == 2
+        assert "AND ct.course_id = ?" in call_args_list[1][0]
+        assert call_args_list[1][1] == (1, 5)
 
     @pytest.mark.asyncio
     @patch("api.db.analytics.execute_db_operation")
     async def test_get_cohort_completion_quiz_partial_completion(self, mock_db):
         """Test quiz task with partial question completion."""
         mock_db.side_effect = [
-            [],  # no completed tasks
-            [(1, 301)],  # user 1 completed question 301 only
-            [],  # no learning material tasks
-            [(104, 301), (104, 302), (104, 303)],  # quiz with 3 questions
+            [(1, None, 301)],  # user 1 completed question 301 only
+            # no learning material tasks, quiz with 3 questions
+            [(104, "quiz", 301), (104, "quiz", 302), (104, "quiz", 303)],
         ]
 
         result = await get_cohort_completion(cohort_id=1, user_ids=[1], course_id=None)
@@ -216,10 +235,9 @@ class TestGetCohortCompletion:
     async def test_get_cohort_completion_quiz_full_completion(self, mock_db):
         """Test quiz task with full question completion."""
         mock_db.side_effect = [
-            [],  # no completed tasks
-            [(1, 301), (1, 302)],  # user 1 completed all questions
-            [],  # no learning material tasks
-            [(104, 301), (104, 302)],  # quiz with 2 questions
+            [(1, None, 301), (1, None, 302)],  # user 1 completed all questions
+            # no learning material tasks, quiz with 2 questions
+            [(104, "quiz", 301), (104, "quiz", 302)],
         ]
 
         result = await get_cohort_completion(cohort_id=1, user_ids=[1], course_id=None)
@@ -236,7 +254,7 @@ class TestGetCohortCompletion:
     @patch("api.db.analytics.execute_db_operation")
     async def test_get_cohort_completion_empty_results(self, mock_db):
         """Test cohort completion with no data."""
-        mock_db.side_effect = [[], [], [], []]
+        mock_db.side_effect = [[], []]
 
         result = await get_cohort_completion(
             cohort_id=1, user_ids=[1, 2], course_id=None
@@ -250,10 +268,21 @@ class TestGetCohortCompletion:
     async def test_get_cohort_completion_multiple_users(self, mock_db):
         """Test cohort completion with multiple users having different completions."""
         mock_db.side_effect = [
-            [(1, 101), (2, 102), (3, 101)],  # completed tasks
-            [(1, 301), (2, 302)],  # completed questions
-            [(101,), (102,)],  # learning material tasks
-            [(103, 301), (103, 302)],  # quiz questions
+            # completed tasks and questions
+            [
+                (1, 101, None),
+                (2, 102, None),
+                (3, 101, None),
+                (1, None, 301),
+                (2, None, 302),
+            ],
+            # learning material tasks and quiz questions
+            [
+                (101, "learning_material", None),
+                (102, "learning_material", None),
+                (103, "quiz", 301),
+                (103, "quiz", 302),
+            ],
         ]
 
         result = await get_cohort_completion(
@@ -280,10 +309,9 @@ class TestGetCohortCompletion:
     async def test_get_cohort_completion_only_learning_material(self, mock_db):
         """Test cohort completion with only learning material tasks."""
         mock_db.side_effect = [
-            [(1, 101)],  # completed tasks
-            [],  # no completed questions
-            [(101,), (102,)],  # learning material tasks
-            [],  # no quiz questions
+            [(1, 101, None)],  # completed tasks, no completed questions
+            # learning material tasks, no quiz questions
+            [(101, "learning_material", None), (102, "learning_material", None)],
         ]
 
         result = await get_cohort_completion(cohort_id=1, user_ids=[1], course_id=None)
@@ -302,8 +330,8 @@ class TestGetCohortCourseAttemptData:
     async def test_get_cohort_course_attempt_data_basic(self, mock_db):
         """Test basic cohort course attempt data functionality."""
         mock_db.side_effect = [
-            [(1,), (2,)],  # task completions for users 1 and 2
-            [(3,)],  # chat messages for user 3
+            # task completions for users 1 and 2, chat messages for user 3
+            [(1,), (2,), (3,)],
         ]
 
         result = await get_cohort_course_attempt_data(
@@ -320,13 +348,20 @@ class TestGetCohortCourseAttemptData:
         assert result[2][5]["has_attempted"] is True
         assert result[3][5]["has_attempted"] is True
 
+        # Both attempt sources should be checked in a single query, with the
+        # learner ids bound as parameters along with the course id
+        mock_db.assert_called_once()
+        query, params = mock_db.call_args[0]
+        assert "UNION" in query
+        assert query.count("IN (?, ?, ?) AND ct.course_id = ?") == 2
+        assert params == (1, 2, 3, 5, 1, 2, 3, 5)
+
     @pytest.mark.asyncio
     @patch("api.db.analytics.execute_db_operation")
     async def test_get_cohort_course_attempt_data_no_attempts(self, mock_db):
         """Test cohort course attempt data with no attempts."""
         mock_db.side_effect = [
-            [],  # no task completions
-            [],  # no chat messages
+            [],  # no task completions or chat messages
         ]
 
         result = await get_cohort_course_attempt_data(
@@ -344,8 +379,8 @@ class TestGetCohortCourseAttemptData:
     async def test_get_cohort_course_attempt_data_mixed_attempts(self, mock_db):
         """Test cohort course attempt data with mixed attempt patterns."""
         mock_db.side_effect = [
-            [(1,)],  # only user 1 has task completions
-            [(2,)],  # only user 2 has chat messages
+            # only user 1 has task completions, only user 2 has chat messages
+            [(1,), (2,)],
         ]
 
         result = await get_cohort_course_attempt_data(
@@ -362,8 +397,8 @@ class TestGetCohortCourseAttemptData:
     async def test_get_cohort_course_attempt_data_user_in_both_sources(self, mock_db):
         """Test user appearing in both task completions and chat messages."""
         mock_db.side_effect = [
-            [(1,)],  # user 1 in task completions
-            [(1,)],  # user 1 also in chat messages
+            # user 1 in task completions and chat messages, deduplicated by UNION
+            [(1,)],
         ]
 
         result = await get_cohort_course_attempt_data(
@@ -377,7 +412,7 @@ class TestGetCohortCourseAttemptData:
     @patch("api.db.analytics.execute_db_operation")
     async def test_get_cohort_course_attempt_data_empty_learner_list(self, mock_db):
         """Test with empty learner list."""
-        mock_db.side_effect = [[], []]
+        mock_db.side_effect = [[]]
 
         result = await get_cohort_course_attempt_data(
             cohort_learner_ids=[], course_id=5
@@ -391,26 +426,13 @@ class TestGetCohortStreaks:
     """Test suite for get_cohort_streaks function."""
 
     @pytest.mark.asyncio
-    @patch("api.db.analytics.get_user_streak_from_usage_dates")
     @patch("api.db.analytics.execute_db_operation")
-    async def test_get_cohort_streaks_all_time(self, mock_db, mock_streak):
+    async def test_get_cohort_streaks_all_time(self, mock_db):
         """Test getting cohort streaks for all time view."""
         mock_db.return_value = [
-            (
-                1,
-                "user1@example.com",
-                "John",
-                "M",
-                "Doe",
-                "2023-01-01,2023-01-02,2023-01-03",
-            ),
-            (2, "user2@example.com", "Jane", None, "Smith", "2023-01-01,2023-01-02"),
-            (3, "user3@example.com", "Bob", None, "Wilson", None),
-        ]
-
-        mock_streak.side_effect = [
-            ["2023-01-01", "2023-01-02", "2023-01-03"],  # 3-day streak
-            ["2023-01-01", "2023-01-02"],  # 2-day streak
+            (1, "user1@example.com", "John", "M", "Doe", 3),
+            (2, "user2@example.com", "Jane", None, "Smith", 2),
+            (3, "user3@example.com", "Bob", None, "Wilson", 0),
         ]
 
         result = await get_cohort_streaks(
@@ -435,7 +457,7 @@ class TestGetCohortStreaks:
         assert result[1]["user"]["last_name"] == "Smith"
         assert result[1]["streak_count"] == 2
 
-        # User 3 with no usage dates
+        # User 3 with no current streak
         assert result[2]["user"]["id"] == 3
         assert result[2]["user"]["email"] == "user3@example.com"
         assert result[2]["streak_count"] == 0
@@ -445,16 +467,13 @@ class TestGetCohortStreaks:
         assert "AND DATE(datetime(timestamp" not in call_args
 
     @pytest.mark.asyncio
-    @patch("api.db.analytics.get_user_streak_from_usage_dates")
     @patch("api.db.analytics.execute_db_operation")
-    async def test_get_cohort_streaks_weekly(self, mock_db, mock_streak):
+    async def test_get_cohort_streaks_weekly(self, mock_db):
         """Test getting cohort streaks for weekly view."""
         mock_db.return_value = [
-            (1, "user1@example.com", "John", None, "Doe", "2023-01-01,2023-01-02"),
+            (1, "user1@example.com", "John", None, "Doe", 2),
         ]
 
-        mock_streak.return_value = ["2023-01-01", "2023-01-02"]
-
         result = await get_cohort_streaks(view=LeaderboardViewType.WEEKLY, cohort_id=1)
 
         assert len(result) == 1
@@ -468,16 +487,13 @@ class TestGetCohortStreaks:
         )
 
     @pytest.mark.asyncio
-    @patch("api.db.analytics.get_user_streak_from_usage_dates")
     @patch("api.db.analytics.execute_db_operation")
-    async def test_get_cohort_streaks_monthly(self, mock_db, mock_streak):
+    async def test_get_cohort_streaks_monthly(self, mock_db):
         """Test getting cohort streaks for monthly view."""
         mock_db.return_value = [
-            (1, "user1@example.com", "John", None, "Doe", "2023-01-01"),
+            (1, "user1@example.com", "John", None, "Doe", 1),
         ]
 
-        mock_streak.return_value = ["2023-01-01"]
-
         result = await get_cohort_streaks(view=LeaderboardViewType.MONTHLY, cohort_id=1)
 
         assert len(result) == 1
@@ -503,83 +519,36 @@ class TestGetCohortStreaks:
         assert result == []
 
     @pytest.mark.asyncio
-    @patch("api.db.analytics.get_user_streak_from_usage_dates")
     @patch("api.db.analytics.execute_db_operation")
-    async def test_get_cohort_streaks_user_with_empty_usage_dates(
-        self, mock_db, mock_streak
-    ):
-        """Test getting cohort streaks for user with empty usage dates string."""
+    async def test_get_cohort_streaks_computed_in_query(self, mock_db):
+        """Test that only the current run of consecutive days is counted in SQL."""
         mock_db.return_value = [
-            (1, "user1@example.com", "John", None, "Doe", ""),
+            (1, "user1@example.com", "John", None, "Doe", 3),
         ]
 
-        result = await get_cohort_streaks(
-            view=LeaderboardViewType.ALL_TIME, cohort_id=1
-        )
-
-        assert len(result) == 1
-        assert result[0]["streak_count"] == 0
-
-        # get_user_streak_from_usage_dates should not be called for empty string
-        mock_streak.assert_not_called()
-
-    @pytest.mark.asyncio
-    @patch("api.db.analytics.get_user_streak_from_usage_dates")
-    @patch("api.db.analytics.execute_db_operation")
-    async def test_get_cohort_streaks_usage_dates_processing(
-        self, mock_db, mock_streak
-    ):
-        """Test that usage dates are properly sorted and processed."""
-        mock_db.return_value = [
-            (
-                1,
-                "user1@example.com",
-                "John",
-                None,
-                "Doe",
-                "2023-01-03 12:00:00,2023-01-01 12:00:00,2023-01-02 12:00:00",
-            )
-        ]
-
-        mock_streak.return_value = ["2023-01-01", "2023-01-02", "2023-01-03"]
-
         result = await get_cohort_streaks(cohort_id=1)
 
-        # Verify the dates were sorted before passing to streak function
-        mock_streak.assert_called_once_with(
-            ["2023-01-03 12:00:00", "2023-01-02 12:00:00", "2023-01-01 12:00:00"]
+        call_args = mock_db.call_args[0][0]
+        assert (
+            "ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY activity_date)"
+            in call_args
+        )
+        assert (
+            "HAVING MAX(activity_date) >= DATE('now', '+5 hours', '+30 minutes', '-1 day')"
+            in call_args
         )
+        assert "COALESCE(s.streak_count, 0)" in call_args
 
         assert len(result) == 1
         assert result[0]["streak_count"] == 3
 
     @pytest.mark.asyncio
-    @patch("api.db.analytics.get_user_streak_from_usage_dates")
     @patch("api.db.analytics.execute_db_operation")
-    async def test_get_cohort_streaks_with_batch_id_none(self, mock_db, mock_streak):
+    async def test_get_cohort_streaks_with_batch_id_none(self, mock_db):
         """Test get_cohort_streaks when batch_id is explicitly None."""
         mock_db.return_value = [
-            (
-                1,
-                "user1@example.com",
-                "John",
-                None,
-                "Doe",
-                "2023-01-01 12:00:00,2023-01-02 12:00:00",
-            ),
-            (
-                2,
-                "user2@example.com",
-                "Jane",
-                None,
-                "Smith",
-                "2023-01-01 12:00:00",
-            ),
-        ]
-
-        mock_streak.side_effect = [
-            ["2023-01-01", "2023-01-02"],  # User 1 streak
-            ["2023-01-01"],  # User 2 streak
+            (1, "user1@example.com", "John", None, "Doe", 2),
+            (2, "user2@example.com", "Jane", None, "Smith", 1),
         ]
 
         result = await get_cohort_streaks(cohort_id=1, batch_id=None)
@@ -601,32 +570,12 @@ class TestGetCohortStreaks:
         assert result[1]["streak_count"] == 1
 
     @pytest.mark.asyncio
-    @patch("api.db.analytics.get_user_streak_from_usage_dates")
     @patch("api.db.analytics.execute_db_operation")
-    async def test_get_cohort_streaks_with_batch_id(self, mock_db, mock_streak):
+    async def test_get_cohort_streaks_with_batch_id(self, mock_db):
         """Test get_cohort_streaks when batch_id is provided."""
         mock_db.return_value = [
-            (
-                1,
-                "user1@example.com",
-                "John",
-                "M",
-                "Doe",
-                "2023-01-01 12:00:00,2023-01-02 12:00:00,2023-01-03 12:00:00",
-            ),
-            (
-                2,
-                "user2@example.com",
-                "Jane",
-                None,
-                "Smith",
-                "2023-01-01 12:00:00",
-            ),
-        ]
-
-        mock_streak.side_effect = [
-            ["2023-01-01", "2023-01-02", "2023-01-03"],  # User 1 streak
-            ["2023-01-01"],  # User 2 streak
+            (1, "user1@example.com", "John", "M", "Doe", 3),
+            (2, "user2@example.com", "Jane", None, "Smith", 1),
         ]
 
         result = await get_cohort_streaks(cohort_id=1, batch_id=5)
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock, ANY, call
 from src.api.db.batch import (
+    batch_cache,
     create_batch,
     create_batch_with_members,
     delete_batch,
@@ -11,6 +12,13 @@ from src.api.db.batch import (
 )
 
 
+@pytest.fixture(autouse=True)
+async def clear_batch_cache():
+    """Clear the batch row cache before each test."""
+    await batch_cache.clear()
+    yield
+
+
 @pytest.mark.asyncio
 async def test_database_operations_are_mocked():
     """Test that database operations are properly mocked and don't hit real database."""
@@ -148,12 +156,16 @@ class TestBatchBasicOperations:
     @patch("src.api.db.batch.execute_db_operation")
     async def test_get_all_batches_for_cohort_success(self, mock_execute):
         """Test getting all batches for a cohort with members."""
-        # Mock the JOIN query results
+        # Mock the query results with members aggregated per batch
         mock_results = [
-            (1, "Batch 1", 1, "user1@example.com", "learner"),
-            (1, "Batch 1", 2, "user2@example.com", "mentor"),
-            (2, "Batch 2", 3, "user3@example.com", "learner"),
-            (3, "Batch 3", None, None, None),  # Batch with no members
+            (
+                1,
+                "Batch 1",
+                '[{"id":1,"email":"user1@example.com","role":"learner"},'
+                '{"id":2,"email":"user2@example.com","role":"mentor"}]',
+            ),
+            (2, "Batch 2", '[{"id":3,"email":"user3@example.com","role":"learner"}]'),
+            (3, "Batch 3", "[]"),  # Batch with no members
         ]
         mock_execute.return_value = mock_results
 
@@ -179,6 +191,7 @@ class TestBatchBasicOperations:
         ]
 
         assert result == expected
+        assert "json_group_array" in mock_execute.call_args[0][0]
 
     @patch("src.api.db.batch.execute_db_operation")
     async def test_get_all_batches_for_cohort_empty(self, mock_execute):
@@ -256,16 +269,12 @@ class TestBatchUserOperations:
     @patch("src.api.db.batch.execute_db_operation")
     async def test_get_batches_for_user_in_cohort_success(self, mock_execute):
         """Test successfully getting batches for user in cohort."""
-        # Mock cohort exists, user is in cohort, and batch results
-        cohort_check = (1,)  # Cohort exists
-        user_in_cohort = (1,)  # User is in cohort
-        batch_results = [
-            (1, "Batch 1", "learner"),
-            (2, "Batch 2", "mentor"),
+        # Each row carries the cohort exists / user in cohort checks before the batch
+        mock_execute.return_value = [
+            (1, 1, 1, "Batch 1", "learner"),
+            (1, 1, 2, "Batch 2", "mentor"),
         ]
 
-        mock_execute.side_effect = [cohort_check, user_in_cohort, batch_results]
-
         result = await get_batches_for_user_in_cohort(1, 1)
 
         expected = [
@@ -275,10 +284,14 @@ class TestBatchUserOperations:
 
         assert result == expected
 
+        # Cohort check, membership check and batches are fetched in one query
+        mock_execute.assert_called_once()
+        assert mock_execute.call_args[0][1] == (1, 1, 1, 1, 1)
+
     @patch("src.api.db.batch.execute_db_operation")
     async def test_get_batches_for_user_in_cohort_cohort_not_found(self, mock_execute):
         """Test getting batches when cohort doesn't exist."""
-        mock_execute.return_value = None  # Cohort doesn't exist
+        mock_execute.return_value = [(0, 0, None, None, None)]  # Cohort doesn't exist
 
         with pytest.raises(Exception, match="Cohort not found"):
             await get_batches_for_user_in_cohort(1, 999)
@@ -288,10 +301,8 @@ class TestBatchUserOperations:
         self, mock_execute
     ):
         """Test getting batches when user is not in cohort."""
-        cohort_check = (1,)  # Cohort exists
-        user_in_cohort = None  # User is not in cohort
-
-        mock_execute.side_effect = [cohort_check, user_in_cohort]
+        # Cohort exists, user is not in cohort
+        mock_execute.return_value = [(1, 0, None, None, None)]
 
         with pytest.raises(
             Exception, match="User is not a member of the specified cohort"
@@ -301,11 +312,8 @@ class TestBatchUserOperations:
     @patch("src.api.db.batch.execute_db_operation")
     async def test_get_batches_for_user_in_cohort_no_batches(self, mock_execute):
         """Test getting batches when user has no batches in cohort."""
-        cohort_check = (1,)  # Cohort exists
-        user_in_cohort = (1,)  # User is in cohort
-        batch_results = []  # No batches
-
-        mock_execute.side_effect = [cohort_check, user_in_cohort, batch_results]
+        # Cohort exists, user is in cohort, no batches
+        mock_execute.return_value = [(1, 1, None, None, None)]
 
         result = await get_batches_for_user_in_cohort(1, 1)
 
@@ -328,18 +336,17 @@ async def test_update_batch_name_and_members_add_and_remove():
     with patch("src.api.db.batch.get_new_db_connection") as mock_conn:
         mock_conn_instance = AsyncMock()
         mock_cursor = AsyncMock()
-        # Simulate no existing users for add, all found for remove
         mock_cursor.execute = AsyncMock()
-        # fetchall calls order:
-        # 1) existing active users for add -> []
-        # 2) existing users for remove check -> [(1,), (2,)]
-        mock_cursor.fetchall = AsyncMock(side_effect=[[], [(1,), (2,)]])
+        # Both users are inserted and both are then removed
+        mock_cursor.rowcount = 2
         mock_conn_instance.cursor.return_value = mock_cursor
         mock_conn.return_value.__aenter__.return_value = mock_conn_instance
         await update_batch_name_and_members(1, "NewName", [1, 2], [1, 2])
         # Should call executemany for add and execute for remove
         mock_cursor.executemany.assert_called()
-        mock_cursor.execute.assert_any_call(ANY, (1, 1, 2))
+        mock_cursor.execute.assert_any_call(ANY, (1, "[1,2]"))
+        # Membership is validated from the affected row counts, not prechecked
+        mock_cursor.fetchall.assert_not_called()
         mock_conn_instance.commit.assert_called()
 
 
@@ -349,14 +356,16 @@ async def test_update_batch_name_and_members_add_error():
     with patch("src.api.db.batch.get_new_db_connection") as mock_conn:
         mock_conn_instance = AsyncMock()
         mock_cursor = AsyncMock()
-        # Simulate existing users found
         mock_cursor.execute = AsyncMock()
-        mock_cursor.fetchall = AsyncMock(return_value=[(1,)])
+        # Simulate the user already being active in the batch
+        mock_cursor.rowcount = 0
         mock_conn_instance.cursor.return_value = mock_cursor
         mock_conn.return_value.__aenter__.return_value = mock_conn_instance
         with pytest.raises(Exception, match="already in the batch"):
             await update_batch_name_and_members(1, "NewName", [1], None)
 
+        mock_conn_instance.commit.assert_not_called()
+
 
 @pytest.mark.asyncio
 async def test_update_batch_name_and_members_remove_error():
@@ -364,7 +373,7 @@ async def test_update_batch_name_and_members_remove_error():
     with patch("src.api.db.batch.get_new_db_connection") as mock_get_connection:
         mock_conn = AsyncMock()
         mock_cursor = AsyncMock()
-        mock_cursor.fetchall.return_value = [(1,)]  # Only 1 user found, but 2 requested
+        mock_cursor.rowcount = 1  # Only 1 user removed, but 2 requested
         mock_conn.cursor.return_value = mock_cursor
         mock_get_connection.return_value.__aenter__.return_value = mock_conn
 
@@ -372,6 +381,7 @@ async def test_update_batch_name_and_members_remove_error():
             await update_batch_name_and_members(1, "New Name", None, [1, 2])
 
         mock_get_connection.assert_called_once()
+        mock_conn.commit.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -381,32 +391,59 @@ async def test_validate_batch_belongs_to_cohort():
 
     with patch("src.api.db.batch.execute_db_operation") as mock_execute:
         # Test case 1: Batch belongs to cohort
-        mock_execute.return_value = (1,)  # Returns a result indicating batch exists
+        mock_execute.return_value = (1, "Batch 1", 1)  # The batch row
 
         result = await validate_batch_belongs_to_cohort(1, 1)
 
         assert result is True
         mock_execute.assert_called_once_with(
-            """
-        SELECT 1 FROM batches 
-        WHERE id = ? AND cohort_id = ? AND deleted_at IS NULL
-        """,
-            (1, 1),
+            "SELECT id, name, cohort_id FROM batches WHERE id = ? AND deleted_at IS NULL",
+            (1,),
             fetch_one=True,
         )
 
-        # Test case 2: Batch does not belong to cohort
+        # Test case 2: Batch does not belong to cohort, answered from the cache
         mock_execute.reset_mock()
-        mock_execute.return_value = None  # No result found
 
         result = await validate_batch_belongs_to_cohort(1, 2)
 
+        assert result is False
+        mock_execute.assert_not_called()
+
+        # Test case 3: Batch does not exist
+        mock_execute.return_value = None  # No result found
+
+        result = await validate_batch_belongs_to_cohort(2, 1)
+
         assert result is False
         mock_execute.assert_called_once_with(
-            """
-        SELECT 1 FROM batches 
-        WHERE id = ? AND cohort_id = ? AND deleted_at IS NULL
-        """,
-            (1, 2),
+            "SELECT id, name, cohort_id FROM batches WHERE id = ? AND deleted_at IS NULL",
+            (2,),
             fetch_one=True,
         )
+
+
+@pytest.mark.asyncio
+async def test_batch_cache_invalidated_on_update_and_delete():
+    """Test that renaming or deleting a batch drops its cached row"""
+    with patch("src.api.db.batch.execute_db_operation") as mock_execute, patch(
+        "src.api.db.batch.execute_multiple_db_operations"
+    ), patch("src.api.db.batch.get_new_db_connection") as mock_get_connection:
+        mock_get_connection.return_value.__aenter__.return_value = AsyncMock()
+        mock_execute.side_effect = [
+            (1, "Batch 1", 1),  # batch row
+            [],  # members
+            (1, "Renamed", 1),  # batch row refetched after the update
+            [],  # members
+        ]
+
+        assert (await get_batch_by_id(1))["name"] == "Batch 1"
+
+        result = await update_batch_name_and_members(1, "Renamed")
+
+        assert result["name"] == "Renamed"
+        assert await batch_cache.get(1) == (1, "Renamed", 1)
+
+        await delete_batch(1)
+
+        assert await batch_cache.get(1) is None
@@ -4,6 +4,7 @@ from unittest.mock import patch, AsyncMock, MagicMock, ANY, call
 from datetime import datetime, timezone
 from collections import defaultdict
 from src.api.db.cohort import (
+    batch_cache,
     create_cohort,
     get_cohort_by_id,
     get_all_cohorts_for_org,
@@ -139,9 +140,17 @@ class TestCohortBasicOperations:
 
         mock_execute.assert_called_once_with(ANY, ("New Cohort Name", 123))
 
+    @patch("src.api.db.cohort.batch_cache")
+    @patch("src.api.db.cohort.execute_db_operation")
     @patch("src.api.db.cohort.execute_multiple_db_operations")
-    async def test_delete_cohort(self, mock_execute_multiple):
+    async def test_delete_cohort(
+        self, mock_execute_multiple, mock_execute, mock_batch_cache
+    ):
         """Test deleting a cohort."""
+        mock_batch_cache.delete = AsyncMock()
+        mock_batch_cache.clear = AsyncMock()
+        mock_execute.return_value = [(1,), (2,)]
+
         await delete_cohort(123)
 
         mock_execute_multiple.assert_called_once()
@@ -150,6 +159,32 @@ class TestCohortBasicOperations:
             len(operations) == 5
         )  # Should have 5 delete operations including batches and user_batches
 
+        # Only the cohort's own batches are evicted from the batch cache
+        mock_execute.assert_called_once_with(ANY, (123,), fetch_all=True)
+        assert mock_batch_cache.delete.await_args_list == [call(1), call(2)]
+        mock_batch_cache.clear.assert_not_called()
+
+    @patch("src.api.db.cohort.execute_db_operation")
+    @patch("src.api.db.cohort.execute_multiple_db_operations")
+    async def test_delete_cohort_keeps_other_cohorts_batches_cached(
+        self, mock_execute_multiple, mock_execute
+    ):
+        """Test deleting a cohort leaves other cohorts' cached batches alone."""
+        mock_execute.return_value = [(1,), (2,)]
+
+        await batch_cache.set(1, (1, "Batch 1", 123))
+        await batch_cache.set(2, (2, "Batch 2", 123))
+        await batch_cache.set(3, (3, "Batch 3", 456))
+
+        try:
+            await delete_cohort(123)
+
+            assert await batch_cache.get(1) is None
+            assert await batch_cache.get(2) is None
+            assert await batch_cache.get(3) == (3, "Batch 3", 456)
+        finally:
+            await batch_cache.clear()
+
 
 @pytest.mark.asyncio
 class TestCohortCourseOperations:
@@ -211,8 +211,11 @@ class TestTableCreationFunctions:
 
         await create_chat_history_table(mock_cursor)
 
-        # Should execute CREATE TABLE and 3 CREATE INDEX statements
-        assert mock_cursor.execute.call_count == 4
+        # Should execute CREATE TABLE and 4 CREATE INDEX statements
+        assert mock_cursor.execute.call_count == 5
+
+        calls = [call[0][0] for call in mock_cursor.execute.call_args_list]
+        assert any("CREATE INDEX IF NOT EXISTS idx_chat_history_question_user_created_at" in call for call in calls)
 
     async def test_create_task_completion_table(self):
         """Test creating task completion table."""
@@ -220,8 +223,11 @@ class TestTableCreationFunctions:
 
         await create_task_completion_table(mock_cursor)
 
-        # Should execute CREATE TABLE and 3 CREATE INDEX statements
-        assert mock_cursor.execute.call_count == 4
+        # Should execute CREATE TABLE and 4 CREATE INDEX statements
+        assert mock_cursor.execute.call_count == 5
+
+        calls = [call[0][0] for call in mock_cursor.execute.call_args_list]
+        assert any("CREATE INDEX IF NOT EXISTS idx_task_completion_task_user_created_at" in call for call in calls)
 
     async def test_create_course_generation_jobs_table(self):
         """Test creating course generation jobs table."""
@@ -49,7 +49,6 @@ class TestIntegrationDatabaseOperations:
         mock_conn = AsyncMock()
         mock_cursor = AsyncMock()
         mock_cursor.lastrowid = 1
-        # First call returns existing ID, second call returns the same ID
         mock_cursor.fetchone.return_value = (2,)  # ID of the existing integration
         mock_conn.cursor.return_value = mock_cursor
         mock_conn.__aenter__.return_value = mock_conn
@@ -67,7 +66,9 @@ class TestIntegrationDatabaseOperations:
         result = await create_integration(data)
 
         assert result == 2
-        mock_cursor.execute.assert_called()
+        # The upsert returns the ID itself, without a follow-up SELECT
+        mock_cursor.execute.assert_called_once()
+        assert "RETURNING id" in mock_cursor.execute.call_args[0][0]
         mock_conn.commit.assert_called_once()
 
     @patch("src.api.db.integration.get_new_db_connection")
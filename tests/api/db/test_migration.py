@@ -0,0 +1,99 @@
+import json
+import pytest
+import aiosqlite
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+from src.api.db.migration import cleanup_invalid_chat_history
+
+
+@pytest.mark.asyncio
+class TestCleanupInvalidChatHistory:
+    """Test cleanup_invalid_chat_history against a real SQLite database."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        db_path = str(tmp_path / "test.sqlite")
+
+        @asynccontextmanager
+        async def get_connection():
+            async with aiosqlite.connect(db_path) as conn:
+                yield conn
+
+        with patch(
+            "src.api.db.migration.get_new_db_connection", side_effect=get_connection
+        ):
+            yield db_path
+
+    async def _insert_messages(self, db_path, messages):
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.execute(
+                """CREATE TABLE chat_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_id INTEGER,
+                    role TEXT NOT NULL,
+                    content TEXT,
+                    deleted_at DATETIME
+                )"""
+            )
+            await conn.executemany(
+                "INSERT INTO chat_history (task_id, role, content) VALUES (?, ?, ?)",
+                messages,
+            )
+            await conn.commit()
+
+    async def _get_deleted_ids(self, db_path):
+        async with aiosqlite.connect(db_path) as conn:
+            cursor = await conn.execute(
+                "SELECT id FROM chat_history WHERE deleted_at IS NOT NULL ORDER BY id"
+            )
+            return [row[0] for row in await cursor.fetchall()]
+
+    async def test_falsy_or_blank_feedback_deleted(self, db_path):
+        """Test that assistant messages with falsy or blank feedback are soft deleted."""
+        invalid_contents = [
+            {},
+            {"feedback": None},
+            {"feedback": False},
+            {"feedback": 0},
+            {"feedback": 0.0},
+            {"feedback": ""},
+            {"feedback": "  \t\n"},
+            {"feedback": "\u00a0\u2028\u3000"},
+            {"feedback": []},
+            {"feedback": {}},
+        ]
+        await self._insert_messages(
+            db_path,
+            [(1, "assistant", json.dumps(content)) for content in invalid_contents],
+        )
+
+        await cleanup_invalid_chat_history()
+
+        assert await self._get_deleted_ids(db_path) == list(
+            range(1, len(invalid_contents) + 1)
+        )
+
+    async def test_valid_or_unparsable_content_kept(self, db_path):
+        """Test that valid feedback, non-object content and other rows are left alone."""
+        await self._insert_messages(
+            db_path,
+            [
+                (1, "assistant", json.dumps({"feedback": "Good job"})),
+                (1, "assistant", json.dumps({"feedback": "  ok "})),
+                (1, "assistant", json.dumps({"feedback": True})),
+                (1, "assistant", json.dumps({"feedback": 1})),
+                (1, "assistant", json.dumps({"feedback": ["note"]})),
+                (1, "assistant", json.dumps({"feedback": {"a": 1}})),
+                (1, "assistant", json.dumps([])),
+                (1, "assistant", json.dumps("")),
+                (1, "assistant", "not json"),
+                (1, "assistant", ""),
+                (1, "assistant", None),
+                (None, "assistant", json.dumps({"feedback": ""})),
+                (1, "user", json.dumps({"feedback": ""})),
+            ],
+        )
+
+        await cleanup_invalid_chat_history()
+
+        assert await self._get_deleted_ids(db_path) == []
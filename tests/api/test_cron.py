@@ -5,7 +5,8 @@ from src.api.cron import (
     send_usage_summary_stats,
     check_memory_and_raise_alert,
 )
-import subprocess
+
+GB = 1024**3
 
 
 @pytest.mark.asyncio
@@ -84,27 +85,23 @@ class TestCheckMemoryAndRaiseAlert:
         # Function should complete without error
 
     @patch("src.api.cron.send_slack_notification_for_alerts")
-    @patch("src.api.cron.subprocess.run")
+    @patch("src.api.cron.os.statvfs")
     @patch("src.api.cron.settings")
     async def test_check_memory_production_low_memory_sends_alert(
-        self, mock_settings, mock_subprocess, mock_send_slack
+        self, mock_settings, mock_statvfs, mock_send_slack
     ):
         """Test that alert is sent when memory is low in production."""
         mock_settings.env = "production"
 
-        # Mock subprocess output with low memory (30GB)
-        mock_result = MagicMock()
-        mock_result.stdout = "Filesystem      Size  Used Avail Use% Mounted on\noverlay         100G   70G   30G  70% /\n"
-        mock_subprocess.return_value = mock_result
+        # Mock 30GB of available disk space
+        mock_statvfs.return_value = MagicMock(f_bavail=30 * GB // 4096, f_frsize=4096)
         mock_send_slack.return_value = None
 
         # Call the function
         await check_memory_and_raise_alert()
 
-        # Verify subprocess was called correctly
-        mock_subprocess.assert_called_once_with(
-            ["df", "-h"], stdout=subprocess.PIPE, text=True
-        )
+        # Verify the root filesystem was checked
+        mock_statvfs.assert_called_once_with("/")
 
         # Verify alert was sent
         mock_send_slack.assert_called_once_with(
@@ -112,169 +109,158 @@ class TestCheckMemoryAndRaiseAlert:
         )
 
     @patch("src.api.cron.send_slack_notification_for_alerts")
-    @patch("src.api.cron.subprocess.run")
+    @patch("src.api.cron.os.statvfs")
     @patch("src.api.cron.settings")
     async def test_check_memory_production_sufficient_memory_no_alert(
-        self, mock_settings, mock_subprocess, mock_send_slack
+        self, mock_settings, mock_statvfs, mock_send_slack
     ):
         """Test that no alert is sent when memory is sufficient in production."""
         mock_settings.env = "production"
 
-        # Mock subprocess output with sufficient memory (80GB)
-        mock_result = MagicMock()
-        mock_result.stdout = "Filesystem      Size  Used Avail Use% Mounted on\noverlay         100G   20G   80G  20% /\n"
-        mock_subprocess.return_value = mock_result
+        # Mock 80GB of available disk space
+        mock_statvfs.return_value = MagicMock(f_bavail=80 * GB // 4096, f_frsize=4096)
+        mock_send_slack.return_value = None
 
         # Call the function
         await check_memory_and_raise_alert()
 
-        # Verify subprocess was called correctly
-        mock_subprocess.assert_called_once_with(
-            ["df", "-h"], stdout=subprocess.PIPE, text=True
-        )
+        # Verify the root filesystem was checked
+        mock_statvfs.assert_called_once_with("/")
 
         # Verify no alert was sent
         mock_send_slack.assert_not_called()
 
     @patch("src.api.cron.send_slack_notification_for_alerts")
-    @patch("src.api.cron.subprocess.run")
+    @patch("src.api.cron.os.statvfs")
     @patch("src.api.cron.settings")
     async def test_check_memory_production_memory_exactly_50gb_no_alert(
-        self, mock_settings, mock_subprocess, mock_send_slack
+        self, mock_settings, mock_statvfs, mock_send_slack
     ):
         """Test that no alert is sent when memory is exactly 50GB."""
         mock_settings.env = "production"
 
-        # Mock subprocess output with exactly 50GB memory
-        mock_result = MagicMock()
-        mock_result.stdout = "Filesystem      Size  Used Avail Use% Mounted on\noverlay         100G   50G   50G  50% /\n"
-        mock_subprocess.return_value = mock_result
+        # Mock exactly 50GB of available disk space (50 is not < 50)
+        mock_statvfs.return_value = MagicMock(f_bavail=50 * GB // 4096, f_frsize=4096)
+        mock_send_slack.return_value = None
 
         # Call the function
         await check_memory_and_raise_alert()
 
-        # Verify no alert was sent (since 50 is not < 50)
+        # Verify the root filesystem was checked
+        mock_statvfs.assert_called_once_with("/")
+
+        # Verify no alert was sent
         mock_send_slack.assert_not_called()
 
     @patch("src.api.cron.send_slack_notification_for_alerts")
-    @patch("src.api.cron.subprocess.run")
+    @patch("src.api.cron.os.statvfs")
     @patch("src.api.cron.settings")
     async def test_check_memory_production_memory_49gb_sends_alert(
-        self, mock_settings, mock_subprocess, mock_send_slack
+        self, mock_settings, mock_statvfs, mock_send_slack
     ):
         """Test that alert is sent when memory is 49GB."""
         mock_settings.env = "production"
 
-        # Mock subprocess output with 49GB memory
-        mock_result = MagicMock()
-        mock_result.stdout = "Filesystem      Size  Used Avail Use% Mounted on\noverlay         100G   51G   49G  51% /\n"
-        mock_subprocess.return_value = mock_result
+        # Mock 49GB of available disk space
+        mock_statvfs.return_value = MagicMock(f_bavail=49 * GB // 4096, f_frsize=4096)
         mock_send_slack.return_value = None
 
         # Call the function
         await check_memory_and_raise_alert()
 
+        # Verify the root filesystem was checked
+        mock_statvfs.assert_called_once_with("/")
+
         # Verify alert was sent
         mock_send_slack.assert_called_once_with(
             "Disk space low in EC2 instance: Only 49 GB left!"
         )
 
     @patch("src.api.cron.send_slack_notification_for_alerts")
-    @patch("src.api.cron.subprocess.run")
-    @patch("src.api.cron.settings")
-    async def test_check_memory_production_no_overlay_line(
-        self, mock_settings, mock_subprocess, mock_send_slack
-    ):
-        """Test behavior when no overlay line is found in df output."""
-        mock_settings.env = "production"
-
-        # Mock subprocess output without overlay line
-        mock_result = MagicMock()
-        mock_result.stdout = "Filesystem      Size  Used Avail Use% Mounted on\n/dev/sda1       100G   20G   80G  20% /\n"
-        mock_subprocess.return_value = mock_result
-
-        # Call the function - should handle gracefully when no overlay found
-        # This will likely result in avail_gb being None, which will cause an error
-        # when compared to 50, but let's test the actual behavior
-        try:
-            await check_memory_and_raise_alert()
-        except TypeError:
-            # Expected when trying to compare None < 50
-            pass
-
-        # Verify no alert was sent
-        mock_send_slack.assert_not_called()
-
-    @patch("src.api.cron.send_slack_notification_for_alerts")
-    @patch("src.api.cron.subprocess.run")
+    @patch("src.api.cron.os.statvfs")
     @patch("src.api.cron.settings")
     async def test_check_memory_production_decimal_memory_value(
-        self, mock_settings, mock_subprocess, mock_send_slack
+        self, mock_settings, mock_statvfs, mock_send_slack
     ):
-        """Test parsing decimal memory values correctly."""
+        """Test that fractional GB values are truncated in the alert."""
         mock_settings.env = "production"
 
-        # Mock subprocess output with decimal memory value (45.5GB)
-        mock_result = MagicMock()
-        mock_result.stdout = "Filesystem      Size  Used Avail Use% Mounted on\noverlay         100G   54.5G   45.5G  55% /\n"
-        mock_subprocess.return_value = mock_result
+        # Mock 45.5GB of available disk space
+        mock_statvfs.return_value = MagicMock(
+            f_bavail=int(45.5 * GB) // 4096, f_frsize=4096
+        )
         mock_send_slack.return_value = None
 
         # Call the function
         await check_memory_and_raise_alert()
 
-        # Verify alert was sent with correct integer conversion
+        # Verify the root filesystem was checked
+        mock_statvfs.assert_called_once_with("/")
+
+        # Verify alert was sent
         mock_send_slack.assert_called_once_with(
             "Disk space low in EC2 instance: Only 45 GB left!"
         )
 
     @patch("src.api.cron.send_slack_notification_for_alerts")
-    @patch("src.api.cron.subprocess.run")
+    @patch("src.api.cron.os.statvfs")
     @patch("src.api.cron.settings")
-    async def test_check_memory_production_non_gb_unit(
-        self, mock_settings, mock_subprocess, mock_send_slack
+    async def test_check_memory_production_statvfs_fails_no_alert(
+        self, mock_settings, mock_statvfs, mock_send_slack
     ):
-        """Test behavior when available memory is not in GB units."""
+        """Test that no alert is sent when the filesystem stats can't be read."""
         mock_settings.env = "production"
 
-        # Mock subprocess output with MB units
-        mock_result = MagicMock()
-        mock_result.stdout = "Filesystem      Size  Used Avail Use% Mounted on\noverlay         100G   20G   512M  20% /\n"
-        mock_subprocess.return_value = mock_result
+        mock_statvfs.side_effect = OSError("statvfs failed")
+
+        # Call the function - should handle the failure gracefully
+        await check_memory_and_raise_alert()
 
-        # Call the function - should handle gracefully when unit is not 'g'
-        # This will likely result in avail_gb being None
-        try:
-            await check_memory_and_raise_alert()
-        except TypeError:
-            # Expected when trying to compare None < 50
-            pass
+        # Verify the root filesystem was checked
+        mock_statvfs.assert_called_once_with("/")
 
         # Verify no alert was sent
         mock_send_slack.assert_not_called()
 
     @patch("src.api.cron.send_slack_notification_for_alerts")
-    @patch("src.api.cron.subprocess.run")
+    @patch("src.api.cron.os.statvfs")
     @patch("src.api.cron.settings")
-    async def test_check_memory_production_multiple_overlay_lines(
-        self, mock_settings, mock_subprocess, mock_send_slack
+    async def test_check_memory_production_less_than_1gb_sends_alert(
+        self, mock_settings, mock_statvfs, mock_send_slack
     ):
-        """Test behavior when multiple overlay lines exist (should use first one)."""
+        """Test that an alert is sent when less than 1GB is left."""
         mock_settings.env = "production"
 
-        # Mock subprocess output with multiple overlay lines
-        mock_result = MagicMock()
-        mock_result.stdout = """Filesystem      Size  Used Avail Use% Mounted on
-overlay         100G   70G   30G  70% /
-overlay         200G   50G   150G  25% /other
-"""
-        mock_subprocess.return_value = mock_result
+        # Mock 512MB of available disk space with an unusual fragment size
+        mock_statvfs.return_value = MagicMock(
+            f_bavail=512 * 1024**2 // 512, f_frsize=512
+        )
         mock_send_slack.return_value = None
 
         # Call the function
         await check_memory_and_raise_alert()
 
-        # Verify alert was sent based on first overlay line (30GB)
+        # Verify alert was sent with the space rounded down to whole GB
         mock_send_slack.assert_called_once_with(
-            "Disk space low in EC2 instance: Only 30 GB left!"
+            "Disk space low in EC2 instance: Only 0 GB left!"
+        )
+
+    @patch("src.api.cron.send_slack_notification_for_alerts")
+    @patch("src.api.cron.os.statvfs")
+    @patch("src.api.cron.settings")
+    async def test_check_memory_production_no_free_blocks_sends_alert(
+        self, mock_settings, mock_statvfs, mock_send_slack
+    ):
+        """Test that an alert is sent when no blocks are available."""
+        mock_settings.env = "production"
+
+        mock_statvfs.return_value = MagicMock(f_bavail=0, f_frsize=4096)
+        mock_send_slack.return_value = None
+
+        # Call the function
+        await check_memory_and_raise_alert()
+
+        # Verify alert was sent
+        mock_send_slack.assert_called_once_with(
+            "Disk space low in EC2 instance: Only 0 GB left!"
         )
@@ -12,6 +12,7 @@ from src.api.utils.db import (
     deserialise_list_from_str,
     trace_callback,
     check_table_exists,
+    close_db_connections,
 )
 
 
@@ -134,6 +135,76 @@ class TestDbConnections:
         mock_conn.close.assert_called_once()
 
 
+@pytest.mark.asyncio
+class TestDbConnectionPool:
+    @pytest.fixture(autouse=True)
+    def temp_db(self, tmp_path):
+        with patch(
+            "src.api.utils.db.sqlite_db_path", str(tmp_path / "test.sqlite")
+        ), patch("src.api.utils.db._idle_connections", []) as idle_connections:
+            yield idle_connections
+
+    async def test_connection_reused(self, temp_db):
+        """Test that a released connection is handed out again."""
+        async with get_new_db_connection() as conn:
+            first_conn = conn
+
+        assert temp_db == [first_conn]
+
+        async with get_new_db_connection() as conn:
+            assert conn is first_conn
+            assert temp_db == []
+
+        await close_db_connections()
+        assert temp_db == []
+
+    async def test_new_connection_uses_wal(self, temp_db):
+        """Test that connections switch the database to WAL mode."""
+        async with get_new_db_connection() as conn:
+            cursor = await conn.execute("PRAGMA journal_mode")
+            assert await cursor.fetchone() == ("wal",)
+
+        await close_db_connections()
+
+    async def test_uncommitted_changes_discarded_on_release(self, temp_db):
+        """Test that uncommitted work does not leak to the next user of a connection."""
+        async with get_new_db_connection() as conn:
+            await conn.execute("CREATE TABLE test (id INTEGER)")
+            await conn.commit()
+            await conn.execute("INSERT INTO test (id) VALUES (1)")
+
+        async with get_new_db_connection() as conn:
+            cursor = await conn.execute("SELECT COUNT(*) FROM test")
+            assert await cursor.fetchone() == (0,)
+
+        await close_db_connections()
+
+    async def test_connection_not_pooled_after_exception(self, temp_db):
+        """Test that a connection is closed, not pooled, when the block raises."""
+        with pytest.raises(ValueError):
+            async with get_new_db_connection() as conn:
+                raise ValueError("Test exception")
+
+        assert temp_db == []
+
+        with pytest.raises(ValueError, match="no active connection"):
+            await conn.execute("SELECT 1")
+
+    @patch("src.api.utils.db.DB_POOL_SIZE", 1)
+    async def test_pool_size_limit(self, temp_db):
+        """Test that connections beyond the pool size are closed on release."""
+        async with get_new_db_connection() as first_conn:
+            async with get_new_db_connection() as second_conn:
+                pass
+
+        assert temp_db == [second_conn]
+
+        with pytest.raises(ValueError, match="no active connection"):
+            await first_conn.execute("SELECT 1")
+
+        await close_db_connections()
+
+
 @pytest.mark.asyncio
 class TestDbOperations:
     @patch("src.api.utils.db.get_new_db_connection")
@@ -264,9 +335,10 @@ class TestDbOperations:
         await execute_multiple_db_operations(commands_and_params)
 
         # Check results
-        assert mock_cursor.execute.call_count == 2
+        assert mock_cursor.execute.call_count == 3
         mock_cursor.execute.assert_has_calls(
             [
+                call("BEGIN IMMEDIATE"),
                 call("INSERT INTO test (name) VALUES (?)", ("Test1",)),
                 call("UPDATE test SET name = ? WHERE id = ?", ("Updated", 1)),
             ]
@@ -286,8 +358,12 @@ class TestDbConnectionExceptions:
         async def mock_connect_coroutine(*args, **kwargs):
             return mock_conn
 
-        # Make connect return the coroutine
-        mock_connect.return_value = mock_connect_coroutine()
+        # Make connect return an awaitable that resolves to the mock connection
+        class PendingConnection:
+            def __await__(self):
+                return mock_connect_coroutine().__await__()
+
+        mock_connect.return_value = PendingConnection()
 
         # Make execute work normally but set_trace_callback raise an exception
         mock_conn.execute.return_value = AsyncMock()